@@ -32,15 +32,23 @@ import boto3
 import os
 import re
 import hashlib
+from bisect import bisect_right
+from collections import Counter
 from typing import List, Dict, Any, Optional, Union, Tuple
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import StrEnum
 from datetime import datetime, timezone
 import uuid
-from functools import lru_cache
+from functools import lru_cache, partial
 from botocore.exceptions import ClientError, BotoCoreError
 from botocore.config import Config
 
+try:
+    # orjson (Rust) decodifica las respuestas de Bedrock varias veces más rápido que json
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 # =====================================
 # CONFIGURACIÓN BEDROCK INDEPENDIENTE
 # =====================================
@@ -202,9 +210,22 @@ SMALL_PROMPT_EXECUTION_TIME = int(os.environ.get('SMALL_PROMPT_EXECUTION_TIME',
 MEDIUM_PROMPT_EXECUTION_TIME = int(os.environ.get('MEDIUM_PROMPT_EXECUTION_TIME', '8'))
 LARGE_PROMPT_EXECUTION_TIME = int(os.environ.get('LARGE_PROMPT_EXECUTION_TIME', '15'))
 
+# Tiempos base (small, medium, large) por modo de procesamiento, precalculados una sola vez
+_BOTH_PROCESSING_TIMES = (
+    SMALL_PROMPT_VALIDATION_TIME + SMALL_PROMPT_EXECUTION_TIME,
+    MEDIUM_PROMPT_VALIDATION_TIME + MEDIUM_PROMPT_EXECUTION_TIME,
+    LARGE_PROMPT_VALIDATION_TIME + LARGE_PROMPT_EXECUTION_TIME
+)
+PROCESSING_TIMES_BY_MODE = {
+    "validate_only": (SMALL_PROMPT_VALIDATION_TIME, MEDIUM_PROMPT_VALIDATION_TIME, LARGE_PROMPT_VALIDATION_TIME),
+    "execute_only": (SMALL_PROMPT_EXECUTION_TIME, MEDIUM_PROMPT_EXECUTION_TIME, LARGE_PROMPT_EXECUTION_TIME),
+    "both": _BOTH_PROCESSING_TIMES
+}
+
 # Tamaños de prompt
 SMALL_PROMPT_SIZE = int(os.environ.get('SMALL_PROMPT_SIZE', '1000'))
 MEDIUM_PROMPT_SIZE = int(os.environ.get('MEDIUM_PROMPT_SIZE', '10000'))
+_PROMPT_SIZE_BOUNDARIES = (SMALL_PROMPT_SIZE, MEDIUM_PROMPT_SIZE)
 
 # Scores de calidad
 MIN_VALID_SCORE = float(os.environ.get('MIN_VALID_SCORE', '7.0'))
@@ -333,25 +354,28 @@ class HybridConfig(LambdaConfig):
         
         return cls.with_bedrock_config(bedrock_config, memory_mb)
 
-class ProcessingMode(Enum):
+class ProcessingMode(StrEnum):
     """Modos de procesamiento disponibles"""
     VALIDATE_ONLY = "validate_only"
     EXECUTE_ONLY = "execute_only"
     BOTH = "both"
 
-class ProcessingStrategy(Enum):
+# Modos válidos precalculados para validar entradas sin reconstruir listas por llamada
+VALID_PROCESSING_MODES = frozenset(mode.value for mode in ProcessingMode)
+
+class ProcessingStrategy(StrEnum):
     """Estrategias de procesamiento"""
     LAMBDA_DIRECT = "lambda_direct"
     S3_PROCESSING = "s3_processing"
 
-class ValidationStatus(Enum):
+class ValidationStatus(StrEnum):
     """Estados de validación de prompts"""
     VALID = "valid"
     NEEDS_REVISION = "needs_revision"
     ERROR = "error"
     INVALID = "invalid"
 
-class PromptCategory(Enum):
+class PromptCategory(StrEnum):
     """Categorías de prompts"""
     INSTRUCTION = "instruction"
     QUESTION = "question"
@@ -398,7 +422,7 @@ class LambdaOptimizedAWSManager:
                     'bedrock-runtime',
                     config=self._connection_config
                 )
-                logger.debug(f"Cliente Bedrock inicializado con modelo: {self.bedrock_config.model_id}")
+                logger.debug("Cliente Bedrock inicializado con modelo: %s", self.bedrock_config.model_id)
             
             if LambdaOptimizedAWSManager._s3_client is None:
                 LambdaOptimizedAWSManager._s3_client = self.session.client(
@@ -460,7 +484,7 @@ class LambdaOptimizedAWSManager:
         }
         
         # Verificar timeout de Lambda
-        remaining_time = self._get_remaining_lambda_time()
+        remaining_time = self.get_remaining_lambda_time()
         if remaining_time < self.config.timeout_buffer_seconds:
             raise Exception(f"Tiempo insuficiente en Lambda: {remaining_time}s restantes")
         
@@ -480,17 +504,18 @@ class LambdaOptimizedAWSManager:
                 )
                 
                 # Procesar respuesta
-                response_body = json.loads(response['body'].read())
+                response_body = _json_loads(response['body'].read())
                 
                 if response_body.get('type') == 'error':
                     error_msg = response_body.get('error', {}).get('message', 'Unknown Bedrock error')
                     raise Exception(f"Bedrock Error: {error_msg}")
                 
-                # Log de performance
-                elapsed = time.time() - start_time
-                logger.debug(f"Bedrock call exitosa: {elapsed:.2f}s, "
-                           f"modelo: {self.bedrock_config.model_id}, "
-                           f"tokens: {response_body.get('usage', {}).get('total_tokens', 0)}")
+                # Log de performance: solo se arma si el nivel DEBUG está activo
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Bedrock call exitosa: %.2fs, modelo: %s, tokens: %s",
+                                 time.time() - start_time,
+                                 self.bedrock_config.model_id,
+                                 response_body.get('usage', {}).get('total_tokens', 0))
                 
                 return response_body
                 
@@ -501,15 +526,15 @@ class LambdaOptimizedAWSManager:
                 if error_code == 'ThrottlingException':
                     if attempt < self.bedrock_config.max_retries - 1:
                         wait_time = self.bedrock_config.retry_delay * (2 ** attempt)
-                        logger.warning(f"Throttling - esperando {wait_time}s (intento {attempt + 1})")
+                        logger.warning("Throttling - esperando %ss (intento %s)", wait_time, attempt + 1)
                         await asyncio.sleep(wait_time)
                         continue
                 elif error_code == 'ValidationException':
                     # No reintentar errores de validación
-                    logger.error(f"Error de validación Bedrock: {e}")
+                    logger.error("Error de validación Bedrock: %s", e)
                     raise ValueError(f"Bedrock validation error: {e}")
                 else:
-                    logger.error(f"Error Bedrock (intento {attempt + 1}): {error_code} - {e}")
+                    logger.error("Error Bedrock (intento %s): %s - %s", attempt + 1, error_code, e)
                     if attempt == self.bedrock_config.max_retries - 1:
                         break
                     await asyncio.sleep(self.bedrock_config.retry_delay)
@@ -517,18 +542,18 @@ class LambdaOptimizedAWSManager:
             except Exception as e:
                 last_exception = e
                 if attempt < self.bedrock_config.max_retries - 1:
-                    logger.warning(f"Error general en intento {attempt + 1}, reintentando: {e}")
+                    logger.warning("Error general en intento %s, reintentando: %s", attempt + 1, e)
                     await asyncio.sleep(self.bedrock_config.retry_delay)
                     continue
                 else:
-                    logger.error(f"Error final en Bedrock: {e}")
+                    logger.error("Error final en Bedrock: %s", e)
                     break
         
         # Si llegamos aquí, todos los intentos fallaron
         raise Exception(f"Bedrock call falló después de {self.bedrock_config.max_retries} intentos. "
                        f"Último error: {last_exception}")
     
-    def _get_remaining_lambda_time(self) -> float:
+    def get_remaining_lambda_time(self) -> float:
         """
         Obtener tiempo restante en Lambda function
         
@@ -537,20 +562,35 @@ class LambdaOptimizedAWSManager:
         """
         # En producción, esto vendría del contexto de Lambda
         # Para testing, usamos configuración
-        context_remaining = os.getenv('AWS_LAMBDA_RUNTIME_DEADLINE_MS')
+        deadline_ms = self._get_runtime_deadline_ms()
         
-        if context_remaining:
-            try:
-                deadline_ms = int(context_remaining)
-                current_ms = int(time.time() * 1000)
-                remaining_seconds = (deadline_ms - current_ms) / 1000
-                return max(0, remaining_seconds)
-            except (ValueError, TypeError):
-                pass
+        if deadline_ms is not None:
+            current_ms = int(time.time() * 1000)
+            remaining_seconds = (deadline_ms - current_ms) / 1000
+            return max(0, remaining_seconds)
         
         # Fallback para testing
         return self.config.lambda_timeout_sec - self.config.timeout_buffer_seconds
     
+    def has_runtime_deadline(self) -> bool:
+        """
+        Indica si el tiempo restante proviene de un deadline del runtime.
+        
+        Si es False, get_remaining_lambda_time() retorna un valor constante.
+        """
+        return self._get_runtime_deadline_ms() is not None
+    
+    @staticmethod
+    def _get_runtime_deadline_ms() -> Optional[int]:
+        """Deadline del runtime en milisegundos, None si no está disponible o es inválido."""
+        context_remaining = os.getenv('AWS_LAMBDA_RUNTIME_DEADLINE_MS')
+        if not context_remaining:
+            return None
+        try:
+            return int(context_remaining)
+        except (ValueError, TypeError):
+            return None
+    
     def cleanup_connections(self) -> None:
         """Limpiar conexiones para optimizar memoria"""
         if self.config.memory_optimization:
@@ -628,7 +668,7 @@ class OptimizedPromptValidator:
             )
             
         except Exception as e:
-            logger.error(f"Error validando prompt {prompt_id}: {e}")
+            logger.error("Error validando prompt %s: %s", prompt_id, e)
             return self._create_validation_result(
                 prompt_id, ValidationStatus.ERROR, 0.0, 
                 [f"Error de validación: {str(e)}"],
@@ -693,10 +733,8 @@ class OptimizedPromptValidator:
         # Validación de repetición excesiva
         words = self._regex_cache['whitespace'].split(prompt.lower())
         if len(words) > 10:
-            word_freq = {}
-            for word in words:
-                if len(word) > 3:  # Solo palabras de más de 3 caracteres
-                    word_freq[word] = word_freq.get(word, 0) + 1
+            # Conteo en C (Counter) solo de palabras de más de 3 caracteres
+            word_freq = Counter(word for word in words if len(word) > 3)
             
             max_freq = max(word_freq.values()) if word_freq else 0
             if max_freq > len(words) * 0.1:  # Más del 10% es una palabra
@@ -747,7 +785,7 @@ class OptimizedPromptValidator:
             return self._parse_ai_validation_response(response_text)
                 
         except Exception as e:
-            logger.warning(f"Error en validación IA: {e}")
+            logger.warning("Error en validación IA: %s", e)
             # Fallback a validación básica mejorada
             return self._fallback_ai_validation(prompt)
     
@@ -828,7 +866,7 @@ Responde SOLO con JSON válido:
             }
             
         except (json.JSONDecodeError, ValueError, KeyError) as e:
-            logger.warning(f"Error parseando validación IA: {e}. Respuesta: {response_text[:200]}")
+            logger.warning("Error parseando validación IA: %s. Respuesta: %s", e, response_text[:200])
             return self._fallback_ai_validation(response_text)
     
     def _fallback_ai_validation(self, prompt_or_response: str) -> Dict[str, Any]:
@@ -881,7 +919,7 @@ Responde SOLO con JSON válido:
         Returns:
             Estado de validación
         """
-        if score >= MIN_VALID_SCORE and len(issues) == 0:
+        if score >= MIN_VALID_SCORE and not issues:
             return ValidationStatus.VALID
         elif score >= MIN_REVISION_SCORE:
             return ValidationStatus.NEEDS_REVISION
@@ -932,6 +970,14 @@ class OptimizedPromptExecutor:
         self.aws_manager = aws_manager
         self.config = config
         self.bedrock_config = config.bedrock_config
+        
+        # max_tokens por tramo de input (<1000, <5000, resto), precalculado una vez
+        execution_max_tokens = self.bedrock_config.execution_max_tokens
+        self._max_tokens_by_size = (
+            min(execution_max_tokens, 4000),
+            min(execution_max_tokens, 6000),
+            execution_max_tokens
+        )
     
     async def execute_single_prompt(self, prompt: str, prompt_id: str) -> Dict[str, Any]:
         """
@@ -974,12 +1020,12 @@ class OptimizedPromptExecutor:
             
         except ValueError as e:
             print(f"❌ ERROR VALIDACIÓN {prompt_id}: {e}")
-            logger.error(f"Error de validación ejecutando {prompt_id}: {e}")
+            logger.error("Error de validación ejecutando %s: %s", prompt_id, e)
             return self._create_execution_error(prompt_id, str(e), start_time)
             
         except Exception as e:
             print(f"❌ ERROR EJECUCIÓN {prompt_id}: {e}")
-            logger.error(f"Error ejecutando {prompt_id}: {e}")
+            logger.error("Error ejecutando %s: %s", prompt_id, e)
             return self._create_execution_error(prompt_id, str(e), start_time)
     
     def _calculate_optimal_max_tokens(self, prompt: str) -> int:
@@ -998,13 +1044,13 @@ class OptimizedPromptExecutor:
         # Estimación: ~4 caracteres por token
         estimated_input_tokens = prompt_length // 4
         
-        # Ajustar max_tokens según el tamaño del input y configuración Bedrock
+        # Ajustar max_tokens según el tamaño del input (tramos precalculados desde Bedrock config)
         if estimated_input_tokens < 1000:
-            return min(self.bedrock_config.execution_max_tokens, 4000)
+            return self._max_tokens_by_size[0]
         elif estimated_input_tokens < 5000:
-            return min(self.bedrock_config.execution_max_tokens, 6000)
+            return self._max_tokens_by_size[1]
         else:
-            return self.bedrock_config.execution_max_tokens  # Usar máximo de configuración Bedrock
+            return self._max_tokens_by_size[2]  # Usar máximo de configuración Bedrock
     
     def _validate_execution_input(self, prompt: str) -> None:
         """
@@ -1017,16 +1063,19 @@ class OptimizedPromptExecutor:
         Raises:
             ValueError: Si la entrada no es válida
         """
-        if not prompt or not prompt.strip():
+        # Longitud sin espacios calculada una sola vez (strip copia el prompt completo)
+        stripped_length = len(prompt.strip()) if prompt else 0
+        if not stripped_length:
             raise ValueError("Prompt vacío")
         
         # CORREGIDO: Límite más generoso para prompts grandes
         max_size = 3_000_000  # 3MB límite más generoso (era 1MB)
-        if len(prompt) > max_size:
-            raise ValueError(f"Prompt demasiado largo: {len(prompt):,} caracteres (máximo: {max_size:,})")
+        prompt_length = len(prompt)
+        if prompt_length > max_size:
+            raise ValueError(f"Prompt demasiado largo: {prompt_length:,} caracteres (máximo: {max_size:,})")
         
         # Verificar que no sea solo espacios en blanco
-        if len(prompt.strip()) < 10:
+        if stripped_length < 10:
             raise ValueError("Prompt demasiado corto después de limpiar espacios")
     
     def _process_execution_response(self, ai_response: Dict[str, Any], 
@@ -1270,11 +1319,13 @@ class OptimizedProcessingDecisionEngine:
         max_prompt_size = max(prompt_sizes)
         avg_prompt_size = total_size / total_prompts
         
-        # Clasificar por tamaño optimizado
+        # Clasificar por tamaño en una sola pasada (tramo 0=small, 1=medium, 2=large);
+        # map + Counter recorren y cuentan en C, sin bucle Python por prompt
+        bucket_counts = Counter(map(partial(bisect_right, _PROMPT_SIZE_BOUNDARIES), prompt_sizes))
         size_distribution = {
-            "small": sum(1 for size in prompt_sizes if size < SMALL_PROMPT_SIZE),
-            "medium": sum(1 for size in prompt_sizes if SMALL_PROMPT_SIZE <= size < MEDIUM_PROMPT_SIZE),
-            "large": sum(1 for size in prompt_sizes if size >= MEDIUM_PROMPT_SIZE)
+            "small": bucket_counts[0],
+            "medium": bucket_counts[1],
+            "large": bucket_counts[2]
         }
         
         return {
@@ -1290,32 +1341,13 @@ class OptimizedProcessingDecisionEngine:
         """Estimar tiempo de procesamiento optimizado"""
         small, medium, large = size_distribution["small"], size_distribution["medium"], size_distribution["large"]
         
-        # Tiempos base según modo (en segundos)
-        if config.processing_mode == "validate_only":
-            base_times = {
-                "small": SMALL_PROMPT_VALIDATION_TIME,
-                "medium": MEDIUM_PROMPT_VALIDATION_TIME,
-                "large": LARGE_PROMPT_VALIDATION_TIME
-            }
-        elif config.processing_mode == "execute_only":
-            base_times = {
-                "small": SMALL_PROMPT_EXECUTION_TIME,
-                "medium": MEDIUM_PROMPT_EXECUTION_TIME,
-                "large": LARGE_PROMPT_EXECUTION_TIME
-            }
-        else:  # "both"
-            base_times = {
-                "small": SMALL_PROMPT_VALIDATION_TIME + SMALL_PROMPT_EXECUTION_TIME,
-                "medium": MEDIUM_PROMPT_VALIDATION_TIME + MEDIUM_PROMPT_EXECUTION_TIME,
-                "large": LARGE_PROMPT_VALIDATION_TIME + LARGE_PROMPT_EXECUTION_TIME
-            }
+        # Tiempos base según modo (en segundos); cualquier otro modo se trata como "both"
+        small_time, medium_time, large_time = PROCESSING_TIMES_BY_MODE.get(
+            config.processing_mode, _BOTH_PROCESSING_TIMES
+        )
         
         # Calcular tiempo total
-        total_time_seconds = (
-            small * base_times["small"] +
-            medium * base_times["medium"] +
-            large * base_times["large"]
-        )
+        total_time_seconds = small * small_time + medium * medium_time + large * large_time
         
         # Ajustar por concurrencia
         effective_time = total_time_seconds / config.max_concurrent
@@ -1526,14 +1558,14 @@ class OptimizedHybridPromptProcessor:
         Returns:
             Dict con resultados completos del procesamiento
         """
-        job_id = job_id or self._generate_secure_job_id()
+        job_id = job_id or self._generate_secure_job_id(self.config)
         start_time = time.time()
         
-        logger.info(f"🚀 INICIANDO PROCESAMIENTO CON CONFIGURACIÓN INDEPENDIENTE")
-        logger.info(f"Job ID: {job_id}")
-        logger.info(f"Prompts: {len(prompts) if prompts else 0}")
-        logger.info(f"Modo: {self.config.processing_mode}")
-        logger.info(f"Modelo: {self.config.bedrock_config.model_id}")
+        logger.info("🚀 INICIANDO PROCESAMIENTO CON CONFIGURACIÓN INDEPENDIENTE")
+        logger.info("Job ID: %s", job_id)
+        logger.info("Prompts: %s", len(prompts) if prompts else 0)
+        logger.info("Modo: %s", self.config.processing_mode)
+        logger.info("Modelo: %s", self.config.bedrock_config.model_id)
         
         try:
             # 1. VALIDAR ENTRADA
@@ -1543,14 +1575,14 @@ class OptimizedHybridPromptProcessor:
             analysis = self.decision_engine.analyze_batch(prompts, self.config)
             strategy = analysis["strategy"]
             
-            logger.info(f"Estrategia: {strategy.value}")
-            logger.info(f"Razón: {analysis['reason']}")
-            logger.info(f"Tiempo estimado: {analysis['estimated_time_minutes']:.2f}min")
+            logger.info("Estrategia: %s", strategy.value)
+            logger.info("Razón: %s", analysis['reason'])
+            logger.info("Tiempo estimado: %.2fmin", analysis['estimated_time_minutes'])
             
             # 3. VERIFICAR TIEMPO LAMBDA RESTANTE
-            remaining_time = self.aws_manager._get_remaining_lambda_time()
+            remaining_time = self.aws_manager.get_remaining_lambda_time()
             if remaining_time < analysis["estimated_time_minutes"] * 60 + self.config.timeout_buffer_seconds:
-                logger.warning(f"Tiempo insuficiente - Forzando S3: {remaining_time}s restantes")
+                logger.warning("Tiempo insuficiente - Forzando S3: %ss restantes", remaining_time)
                 strategy = ProcessingStrategy.S3_PROCESSING
                 analysis["strategy"] = strategy
                 analysis["reason"] = "lambda_timeout_risk"
@@ -1568,16 +1600,16 @@ class OptimizedHybridPromptProcessor:
             if self.config.memory_optimization:
                 self.aws_manager.cleanup_connections()
             
-            logger.info(f"✅ PROCESAMIENTO COMPLETADO - {time.time() - start_time:.2f}s")
+            logger.info("✅ PROCESAMIENTO COMPLETADO - %.2fs", time.time() - start_time)
             return final_result
             
         except ValueError as e:
             logger.error(f"Error de validación: {e}")
-            return self._create_error_result_optimized(job_id, f"Validation Error: {e}", start_time)
+            return self._create_error_result_optimized(self.config, job_id, f"Validation Error: {e}", start_time)
             
         except Exception as e:
             logger.error(f"Error crítico en procesamiento: {e}", exc_info=True)
-            return self._create_error_result_optimized(job_id, f"Processing Error: {e}", start_time)
+            return self._create_error_result_optimized(self.config, job_id, f"Processing Error: {e}", start_time)
     
     def _validate_input_comprehensive(self, prompts: List[Dict[str, str]]) -> None:
         """Validación completa de entrada - LÍMITES AUMENTADOS"""
@@ -1620,25 +1652,27 @@ class OptimizedHybridPromptProcessor:
         """Procesamiento directo en Lambda optimizado"""
         logger.info("🚀 Procesamiento Lambda optimizado")
         
-        mode = ProcessingMode(self.config.processing_mode)
+        # Resolver el tipo de tarea una sola vez para todo el batch
+        # (ProcessingMode es StrEnum: el modo en texto se busca directamente, sin convertirlo)
+        create_task = {
+            ProcessingMode.VALIDATE_ONLY: self._validate_single_prompt_task,
+            ProcessingMode.EXECUTE_ONLY: self._execute_single_prompt_task
+        }.get(self.config.processing_mode, self._validate_and_execute_prompt_task)  # BOTH
         
         # Crear tareas optimizadas
-        tasks = []
-        for prompt_data in prompts:
-            prompt = prompt_data.get('prompt', '')
-            prompt_id = prompt_data.get('id', '')
-            
-            if mode == ProcessingMode.VALIDATE_ONLY:
-                task = self._validate_single_prompt_task(prompt, prompt_id)
-            elif mode == ProcessingMode.EXECUTE_ONLY:
-                task = self._execute_single_prompt_task(prompt, prompt_id)
-            else:  # BOTH
-                task = self._validate_and_execute_prompt_task(prompt, prompt_id)
-            
-            tasks.append(task)
+        tasks = [
+            create_task(prompt_data.get('prompt', ''), prompt_data.get('id', ''))
+            for prompt_data in prompts
+        ]
+        
+        # Prompts más largos primero: son las tareas más lentas y, si arrancan al final,
+        # alargan el tiempo total del batch (el orden es estable para tamaños iguales)
+        start_order = sorted(range(len(prompts)),
+                             key=lambda i: len(prompts[i].get('prompt', '')),
+                             reverse=True)
         
         # Ejecutar con control de concurrencia optimizado
-        results = await self._execute_with_optimized_concurrency(tasks)
+        results = await self._execute_with_optimized_concurrency(tasks, start_order)
         
         return self._create_lambda_result_optimized(prompts, results, job_id, analysis)
     
@@ -1661,22 +1695,35 @@ class OptimizedHybridPromptProcessor:
             logger.error(f"Error en procesamiento S3: {e}")
             raise
     
-    async def _execute_with_optimized_concurrency(self, tasks: List) -> List[Dict[str, Any]]:
-        """Ejecutar tareas con concurrencia optimizada"""
+    async def _execute_with_optimized_concurrency(self, tasks: List,
+                                                  start_order: Optional[List[int]] = None) -> List[Dict[str, Any]]:
+        """
+        Ejecutar tareas con concurrencia optimizada
+        
+        Args:
+            tasks: Corrutinas a ejecutar
+            start_order: Índices de tareas en el orden en que deben tomar el semáforo
+                (opcional); los resultados siempre se devuelven en el orden de `tasks`
+        """
         semaphore = asyncio.Semaphore(self.config.max_concurrent)
         
+        # Sin deadline del runtime el tiempo restante es constante: se calcula una sola vez
+        track_deadline = self.aws_manager.has_runtime_deadline()
+        static_remaining = None if track_deadline else self.aws_manager.get_remaining_lambda_time()
+        
         async def run_with_semaphore_and_monitoring(task, task_index):
             async with semaphore:
                 try:
                     # Monitorear tiempo Lambda
-                    remaining = self.aws_manager._get_remaining_lambda_time()
+                    remaining = (self.aws_manager.get_remaining_lambda_time()
+                                 if track_deadline else static_remaining)
                     if remaining < self.config.timeout_buffer_seconds:
                         raise Exception(f"Lambda timeout risk: {remaining}s remaining")
                     
                     return await task
                     
                 except Exception as e:
-                    logger.error(f"Error en tarea {task_index}: {e}")
+                    logger.error("Error en tarea %s: %s", task_index, e)
                     return {
                         "prompt_id": f"task_{task_index}",
                         "status": "error",
@@ -1684,14 +1731,22 @@ class OptimizedHybridPromptProcessor:
                         "execution_successful": False
                     }
         
-        logger.info(f"Ejecutando {len(tasks)} tareas - concurrencia: {self.config.max_concurrent}")
+        logger.info("Ejecutando %s tareas - concurrencia: %s", len(tasks), self.config.max_concurrent)
         
-        # Ejecutar con monitoring
-        results = await asyncio.gather(*[
-            run_with_semaphore_and_monitoring(task, i) 
-            for i, task in enumerate(tasks)
+        # Ejecutar con monitoring; el semáforo atiende a las tareas en orden de llegada (FIFO)
+        order = range(len(tasks)) if start_order is None else start_order
+        ordered_results = await asyncio.gather(*[
+            run_with_semaphore_and_monitoring(tasks[i], i) 
+            for i in order
         ], return_exceptions=False)
         
+        if start_order is None:
+            return ordered_results
+        
+        # Reubicar cada resultado en la posición original de su tarea
+        results = [None] * len(tasks)
+        for i, result in zip(order, ordered_results):
+            results[i] = result
         return results
     
     async def _validate_single_prompt_task(self, prompt: str, prompt_id: str) -> Dict[str, Any]:
@@ -1740,7 +1795,7 @@ class OptimizedHybridPromptProcessor:
             return final_result
             
         except Exception as e:
-            logger.error(f"Error en tarea híbrida {prompt_id}: {e}")
+            logger.error("Error en tarea híbrida %s: %s", prompt_id, e)
             return {
                 "prompt_id": prompt_id,
                 "status": "error",
@@ -1752,7 +1807,7 @@ class OptimizedHybridPromptProcessor:
     def _create_lambda_result_optimized(self, prompts: List[Dict], results: List[Dict], 
                                        job_id: str, analysis: Dict) -> Dict[str, Any]:
         """Crear resultado Lambda optimizado"""
-        mode = ProcessingMode(self.config.processing_mode)
+        mode = self.config.processing_mode
         
         if mode == ProcessingMode.VALIDATE_ONLY:
             summary = self._create_validation_summary_optimized(results)
@@ -1786,26 +1841,28 @@ class OptimizedHybridPromptProcessor:
             return {"total_prompts": 0, "success_rate": "0%"}
         
         total = len(results)
-        valid = sum(1 for r in results if r.get('validation', {}).get('status') == 'valid')
-        needs_revision = sum(1 for r in results if r.get('validation', {}).get('status') == 'needs_revision')
-        errors = total - valid - needs_revision
-        
-        # Calcular métricas avanzadas
-        scores = [
-            r.get('validation', {}).get('quality_score', 0)
-            for r in results
-            if isinstance(r.get('validation', {}).get('quality_score'), (int, float))
-        ]
+        valid = needs_revision = 0
+        scores: List[float] = []
+        times: List[float] = []
+        
+        # Una sola pasada extrae todas las columnas necesarias de cada resultado
+        for r in results:
+            validation = r.get('validation', {})
+            status = validation.get('status')
+            if status == 'valid':
+                valid += 1
+            elif status == 'needs_revision':
+                needs_revision += 1
+            
+            score = validation.get('quality_score')
+            if isinstance(score, (int, float)):
+                scores.append(score)
+            processing_time = validation.get('processing_time')
+            if isinstance(processing_time, (int, float)):
+                times.append(processing_time)
         
+        errors = total - valid - needs_revision
         avg_score = sum(scores) / len(scores) if scores else 0
-        
-        # Calcular tiempo promedio
-        times = [
-            r.get('validation', {}).get('processing_time', 0)
-            for r in results
-            if isinstance(r.get('validation', {}).get('processing_time'), (int, float))
-        ]
-        
         avg_time = sum(times) / len(times) if times else 0
         
         return {
@@ -1824,25 +1881,26 @@ class OptimizedHybridPromptProcessor:
             return {"total_prompts": 0, "execution_rate": "0%"}
         
         total = len(results)
-        executed = sum(1 for r in results if r.get('execution', {}).get('execution_successful'))
-        failed = total - executed
-        
-        # Calcular tokens y tiempos
-        total_tokens = sum(r.get('execution', {}).get('tokens_used', 0) for r in results)
+        executed = total_tokens = 0
+        times: List[float] = []
+        quality_scores: List[float] = []
+        
+        # Una sola pasada: éxito, tokens, tiempos y calidad de respuesta
+        for r in results:
+            execution = r.get('execution', {})
+            if execution.get('execution_successful'):
+                executed += 1
+            total_tokens += execution.get('tokens_used', 0)
+            
+            processing_time = execution.get('processing_time')
+            if isinstance(processing_time, (int, float)):
+                times.append(processing_time)
+            quality_score = execution.get('response_quality', {}).get('score')
+            if quality_score:
+                quality_scores.append(quality_score)
         
-        times = [
-            r.get('execution', {}).get('processing_time', 0)
-            for r in results
-            if isinstance(r.get('execution', {}).get('processing_time'), (int, float))
-        ]
+        failed = total - executed
         avg_time = sum(times) / len(times) if times else 0
-        
-        # Calcular calidad promedio de respuestas
-        quality_scores = [
-            r.get('execution', {}).get('response_quality', {}).get('score', 0)
-            for r in results
-            if r.get('execution', {}).get('response_quality', {}).get('score')
-        ]
         avg_quality = sum(quality_scores) / len(quality_scores) if quality_scores else 0
         
         return {
@@ -1861,20 +1919,17 @@ class OptimizedHybridPromptProcessor:
             return {"total_prompts": 0, "hybrid_success_rate": "0%"}
         
         total = len(results)
-        
-        # Métricas de validación
-        valid = sum(1 for r in results if r.get('validation', {}).get('status') == 'valid')
-        
-        # Métricas de ejecución
-        executed = sum(1 for r in results if r.get('execution', {}).get('execution_successful'))
-        
-        # Métricas híbridas
-        both_successful = sum(1 for r in results 
-                            if (r.get('validation', {}).get('status') == 'valid' and 
-                                r.get('execution', {}).get('execution_successful')))
-        
-        # Métricas de tokens
-        total_tokens = sum(r.get('execution', {}).get('tokens_used', 0) for r in results)
+        valid = executed = both_successful = total_tokens = 0
+        
+        # Métricas de validación, ejecución, híbridas y tokens en una sola pasada
+        for r in results:
+            execution = r.get('execution', {})
+            is_valid = r.get('validation', {}).get('status') == 'valid'
+            is_executed = bool(execution.get('execution_successful'))
+            valid += is_valid
+            executed += is_executed
+            both_successful += is_valid and is_executed
+            total_tokens += execution.get('tokens_used', 0)
         
         return {
             "total_prompts": total,
@@ -1919,7 +1974,8 @@ class OptimizedHybridPromptProcessor:
         
         return result
     
-    def _generate_secure_job_id(self) -> str:
+    @staticmethod
+    def _generate_secure_job_id(config: HybridConfig) -> str:
         """Generar ID único y seguro para el job"""
         timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
         
@@ -1927,10 +1983,12 @@ class OptimizedHybridPromptProcessor:
         unique_data = f"{timestamp}_{uuid.uuid4()}_{os.getpid()}_{time.time()}"
         unique_hash = hashlib.sha256(unique_data.encode()).hexdigest()[:12]
         
-        return f"hybrid_{self.config.processing_mode}_{timestamp}_{unique_hash}"
+        return f"hybrid_{config.processing_mode}_{timestamp}_{unique_hash}"
     
-    def _create_error_result_optimized(self, job_id: str, error_msg: str, start_time: float) -> Dict[str, Any]:
-        """Crear resultado de error optimizado"""
+    @staticmethod
+    def _create_error_result_optimized(config: HybridConfig, job_id: str, error_msg: str,
+                                       start_time: float) -> Dict[str, Any]:
+        """Crear resultado de error optimizado (no requiere clientes AWS inicializados)"""
         return {
             "job_id": job_id,
             "status": "failed",
@@ -1939,8 +1997,8 @@ class OptimizedHybridPromptProcessor:
             "summary": {"total_prompts": 0, "success_rate": "0%"},
             "results": [],
             "timestamp": datetime.now(timezone.utc).isoformat(),
-            "environment": self.config.environment,
-            "bedrock_model": self.config.bedrock_config.model_id,
+            "environment": config.environment,
+            "bedrock_model": config.bedrock_config.model_id,
             "version": "2.0.5"
         }
 
@@ -2019,18 +2077,20 @@ class IntelligentReportGenerator:
             execution = result.get('execution', {})
             if execution and execution.get('execution_successful'):
                 response_text = execution.get('response', '')
+                response_length = len(response_text)
+                response_quality = execution.get('response_quality', {})
                 
                 # CRÍTICO: Incluir respuesta COMPLETA para análisis profundo
                 successful_responses.append({
                     'id': prompt_id,
                     'full_response': response_text,  # RESPUESTA COMPLETA
-                    'response_length': len(response_text),
-                    'response_preview': response_text[:200] + "..." if len(response_text) > 200 else response_text,
+                    'response_length': response_length,
+                    'response_preview': response_text[:200] + "..." if response_length > 200 else response_text,
                     'tokens': execution.get('tokens_used', 0),
-                    'quality_score': execution.get('response_quality', {}).get('score', 0),
-                    'completeness': execution.get('response_quality', {}).get('completeness', 'unknown'),
-                    'word_count': execution.get('response_quality', {}).get('word_count', 0),
-                    'coherence': execution.get('response_quality', {}).get('coherence', 'unknown'),
+                    'quality_score': response_quality.get('score', 0),
+                    'completeness': response_quality.get('completeness', 'unknown'),
+                    'word_count': response_quality.get('word_count', 0),
+                    'coherence': response_quality.get('coherence', 'unknown'),
                     'model_used': execution.get('model_used', 'unknown')  # Incluir modelo específico
                 })
             elif execution:
@@ -2249,21 +2309,26 @@ Begin your analysis:"""
 """
         
         # Agregar distribución de respuestas si hay datos
-        if data['successful_responses']:
-            avg_tokens = sum(r['tokens'] for r in data['successful_responses']) / len(data['successful_responses'])
-            avg_quality = sum(r['quality_score'] for r in data['successful_responses']) / len(data['successful_responses'])
+        successful_responses = data['successful_responses']
+        if successful_responses:
+            # Totales y distribución de completitud en una sola pasada
+            total_tokens = 0
+            total_quality = 0
+            completeness_dist = Counter()
+            for r in successful_responses:
+                total_tokens += r['tokens']
+                total_quality += r['quality_score']
+                completeness_dist[r['completeness']] += 1
+            
+            response_count = len(successful_responses)
+            avg_tokens = total_tokens / response_count
+            avg_quality = total_quality / response_count
             
             final_report += f"""
 - **Average Response Length:** {avg_tokens:.0f} tokens
 - **Average Quality Score:** {avg_quality:.2f}/10
 - **Response Completeness Distribution:**"""
             
-            # Completeness distribution
-            completeness_dist = {}
-            for r in data['successful_responses']:
-                comp = r['completeness']
-                completeness_dist[comp] = completeness_dist.get(comp, 0) + 1
-            
             for comp, count in completeness_dist.items():
                 final_report += f"\n  - {comp.title()}: {count} responses"
         
@@ -2480,7 +2545,7 @@ def process_prompts_with_config(
     
     try:
         # Validar modo
-        if mode not in ["validate_only", "execute_only", "both"]:
+        if mode not in VALID_PROCESSING_MODES:
             raise ValueError(f"Modo inválido: {mode}")
         
         # Crear configuración híbrida con configuración Bedrock específica
@@ -2491,10 +2556,10 @@ def process_prompts_with_config(
         config.processing_mode = mode
         config.max_concurrent = max_concurrent
         
-        logger.info(f"🚀 Procesamiento con configuración independiente")
-        logger.info(f"Modelo: {bedrock_config.model_id}")
-        logger.info(f"Región: {bedrock_config.region_name}")
-        logger.info(f"Prompts: {len(prompts) if prompts else 0}")
+        logger.info("🚀 Procesamiento con configuración independiente")
+        logger.info("Modelo: %s", bedrock_config.model_id)
+        logger.info("Región: %s", bedrock_config.region_name)
+        logger.info("Prompts: %s", len(prompts) if prompts else 0)
         
         # Ejecutar procesamiento
         result = asyncio.run(_process_prompts_async_with_config(
@@ -2503,7 +2568,7 @@ def process_prompts_with_config(
             job_id=job_id
         ))
         
-        logger.info(f"✅ Procesamiento completado: {result.get('status')}")
+        logger.info("✅ Procesamiento completado: %s", result.get('status'))
         return result
         
     except ValueError as e:
@@ -2655,13 +2720,15 @@ def process_prompts_hybrid_optimized(
         )
     """
     
+    start_time = time.time()
+    
     try:
         # Validar modo
-        if mode not in ["validate_only", "execute_only", "both"]:
+        if mode not in VALID_PROCESSING_MODES:
             raise ValueError(f"Modo inválido: {mode}")
         
         # Crear configuración Bedrock
-        if any([bedrock_model, bedrock_region, aws_access_key, aws_secret_key]):
+        if bedrock_model or bedrock_region or aws_access_key or aws_secret_key:
             # Usar configuración específica proporcionada
             bedrock_config = BedrockConfig(
                 model_id=bedrock_model or BedrockConfig().model_id,
@@ -2685,10 +2752,21 @@ def process_prompts_hybrid_optimized(
         if bucket_name:
             config.s3_bucket = bucket_name
         
-        logger.info(f"🚀 Procesamiento híbrido optimizado v2.0.5")
-        logger.info(f"Prompts: {len(prompts) if prompts else 0}")
-        logger.info(f"Modelo: {bedrock_config.model_id}")
-        logger.info(f"Región: {bedrock_config.region_name}")
+        # Sin prompts no hay nada que procesar: se responde con el mismo resultado
+        # de error que el procesador, sin crear clientes AWS ni event loop
+        if not prompts:
+            logger.error("Error de validación: Lista de prompts vacía")
+            return OptimizedHybridPromptProcessor._create_error_result_optimized(
+                config,
+                job_id or OptimizedHybridPromptProcessor._generate_secure_job_id(config),
+                "Validation Error: Lista de prompts vacía",
+                start_time
+            )
+        
+        logger.info("🚀 Procesamiento híbrido optimizado v2.0.5")
+        logger.info("Prompts: %s", len(prompts) if prompts else 0)
+        logger.info("Modelo: %s", bedrock_config.model_id)
+        logger.info("Región: %s", bedrock_config.region_name)
         
         # Ejecutar procesamiento
         result = asyncio.run(_process_prompts_async_with_config(
@@ -2697,7 +2775,7 @@ def process_prompts_hybrid_optimized(
             job_id=job_id
         ))
         
-        logger.info(f"✅ Procesamiento completado: {result.get('status')}")
+        logger.info("✅ Procesamiento completado: %s", result.get('status'))
         return result
         
     except ValueError as e:
@@ -2752,7 +2830,7 @@ def validate_prompts_lambda(
         Dict con resultados (misma estructura)
     """
     
-    logger.info(f"📞 validate_prompts_lambda llamada - redirigiendo a process_prompts_hybrid_optimized")
+    logger.info("📞 validate_prompts_lambda llamada - redirigiendo a process_prompts_hybrid_optimized")
     
     return process_prompts_hybrid_optimized(
         prompts=prompts,
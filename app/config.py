@@ -164,7 +164,12 @@ class Config:
     def REPORT_LAMBDA(self) -> str:
         """Lambda para generar reportes."""
         return self._get_env_cached('REPORT_LAMBDA', '')
-    
+
+    @property
+    def READ_AND_CONVERT_LAMBDA(self) -> str:
+        """Lambda que descarga y convierte un archivo a markdown en una sola invocación."""
+        return self._get_env_cached('READ_AND_CONVERT_LAMBDA', '')
+
     # =============================================================================
     # REPOSITORY ACCESS
     # =============================================================================
@@ -231,11 +236,32 @@ class Config:
         """Habilitar cache de respuestas."""
         return self._get_env_bool('ENABLE_CACHING', True)
     
+    @property
+    def REPO_CACHE_TTL_SECONDS(self) -> int:
+        """
+        Vigencia (segundos) del cache de estructuras de repositorio.
+        
+        Por defecto 0 (desactivado): el cache se indexa por (repositorio, rama), así que
+        una validación justo después de un push vería la estructura anterior. Activarlo
+        solo cuando se acepte esa ventana de desactualización.
+        """
+        return self._get_env_int('REPO_CACHE_TTL_SECONDS', 0)
+    
     @property
     def ENABLE_RETRY(self) -> bool:
         """Habilitar reintentos automáticos."""
         return self._get_env_bool('ENABLE_RETRY', True)
-    
+
+    @property
+    def ENABLE_FUSED_FILE_READ(self) -> bool:
+        """Habilitar descarga+conversión de archivos en una sola invocación Lambda."""
+        return self._get_env_bool('ENABLE_FUSED_FILE_READ', False)
+
+    @property
+    def ENABLE_BATCH_FILE_READ(self) -> bool:
+        """Habilitar lectura de varios archivos en una sola invocación (DOWNLOAD_AND_CONVERT_BATCH)."""
+        return self._get_env_bool('ENABLE_BATCH_FILE_READ', False)
+
     @property
     def ENABLE_LOGGING(self) -> bool:
         """Habilitar logging detallado."""
@@ -282,7 +308,8 @@ class Config:
         return {
             'get_repo_structure': self.GET_REPO_STRUCTURE_LAMBDA,
             'file_reader': self.FILE_READER_LAMBDA,
-            'report': self.REPORT_LAMBDA
+            'report': self.REPORT_LAMBDA,
+            'read_and_convert': self.READ_AND_CONVERT_LAMBDA
         }
     
     def get_timeout_config(self) -> Dict[str, int]:
@@ -48,33 +48,14 @@ import os
 from typing import List, Dict, Set, Optional
 from collections import defaultdict
 from dataclasses import dataclass
+from functools import lru_cache
 
+# Modelos canónicos: una única definición compartida por todo el paquete
 from app.models import MarkdownDocument, RuleData
 
-# ===== MODELS (Asumiendo que ya tienes estos en models.py) =====
-# Si no tienes models.py, descomenta estas definiciones:
-
-# from pydantic import BaseModel, Field
-# from typing import List, Optional
-
-# class MarkdownDocument(BaseModel):
-#     path: str = Field(..., description="Ruta del archivo")
-#     content: str = Field(..., description="Contenido del archivo")
-
-# class RuleData(BaseModel):
-#     id: str = Field(..., description="ID único de la regla")
-#     documentation: Optional[str] = Field(default=None, description="Documentación")
-#     type: Optional[str] = Field(default=None, description="Tipo de regla")
-#     description: str = Field(..., description="Descripción")
-#     criticality: Optional[str] = Field(default=None, description="Criticidad")
-#     references: Optional[str] = Field(default=None, description="Referencias")
-#     markdownfiles: List[MarkdownDocument] = Field(default_factory=list, description="Archivos markdown")
-#     explanation: Optional[str] = Field(default=None, description="Explicación")
-#     tags: List[str] = Field(default_factory=list, description="Tags")
-
 # ===== DOMAIN LAYER =====
 
-@dataclass
+@dataclass(slots=True)
 class RuleGroup:
     """Entidad principal - Grupo de reglas procesadas"""
     group: str
@@ -96,7 +77,7 @@ class GroupingRules:
 
 # ===== APPLICATION LAYER =====
 
-@dataclass
+@dataclass(slots=True)
 class RuleIndices:
     """Índices de reglas clasificadas (optimización de memoria)"""
     without_references: List[int]
@@ -419,13 +400,6 @@ class MarkdownProcessor:
     def _ensure_markdowndocument(self, md_item) -> Optional['MarkdownDocument']:
         """✅ CORREGIDO: Garantiza que el item es un MarkdownDocument válido"""
         
-        try:
-            from app.models import MarkdownDocument
-        except ImportError:
-            # Fallback si no se puede importar
-            print("⚠️ No se pudo importar MarkdownDocument de app.models")
-            return None
-        
         # Si ya es un MarkdownDocument válido con 'path'
         if hasattr(md_item, 'path') and hasattr(md_item, 'content'):
             path = str(getattr(md_item, 'path', ''))
@@ -490,13 +464,6 @@ class RuleCleaner:
         """✅ MANTIENE toda la estructura de las reglas - Solo limpia markdownfiles para evitar duplicados"""
         cleaned_rules = []
         
-        try:
-            from app.models import RuleData
-        except ImportError:
-            # Si no se puede importar, retornar las reglas originales sin markdownfiles
-            print("⚠️ No se pudo importar RuleData, manteniendo estructura original")
-            return rules
-        
         for rule in rules:
             # Crear nueva regla SIN markdownfiles (están a nivel de grupo)
             cleaned_rule = RuleData(
@@ -514,6 +481,11 @@ class RuleCleaner:
         
         return cleaned_rules
 
+@lru_cache(maxsize=1024)
+def _explanation_hash(explanation: str) -> str:
+    """Hash corto de un texto de explanation; memoizado porque las reglas se repiten entre invocaciones"""
+    return hashlib.md5(explanation.encode()).hexdigest()[:8]
+
 class GroupNamer:
     """Generador de nombres para grupos"""
     
@@ -527,8 +499,7 @@ class GroupNamer:
         if not explanation or not explanation.strip():
             explanation = "empty_explanation"
         
-        explanation_hash = hashlib.md5(explanation.encode()).hexdigest()[:8]
-        return f"exp_{group_number}_{explanation_hash}"
+        return f"exp_{group_number}_{_explanation_hash(explanation)}"
     
     def name_individual_group(self, sequence: int, rule_id: str) -> str:
         """Nombra grupos individuales"""
@@ -596,11 +567,6 @@ class LambdaAdapter:
     
     def _convert_to_domain_objects(self, rules_data: List[dict]) -> List['RuleData']:
         """✅ CORREGIDO: Convierte datos de entrada a objetos del dominio - MANEJA DICCIONARIOS"""
-        try:
-            from app.models import RuleData, MarkdownDocument
-        except ImportError:
-            raise ImportError("No se pueden importar los modelos desde app.models")
-        
         rules = []
         for rule_dict in rules_data:
             # ✅ MEJORADO: Convertir markdownfiles manejando diferentes estructuras
@@ -656,7 +622,7 @@ class LambdaAdapter:
                 criticality=rule_dict.get('criticality'),
                 references=rule_dict.get('references'),
                 markdownfiles=markdown_files,
-                explanation=rule_dict.get('explanation'),
+                explanation=RuleData.normalize_explanation(rule_dict.get('explanation')),
                 tags=rule_dict.get('tags', [])
             )
             rules.append(rule)
@@ -904,23 +870,18 @@ def group_rules(rules: List['RuleData'], batch_size: int = 20, load_file_content
         service._markdown_processor.auto_load_files = True
     
     groups = service.group_rules(rules, batch_size)
-
-    # incluir id en la descripción de las reglas para que salgan en el informe
-    for rule_group in groups:
-
-        for rule in rule_group.rules:
-
-            rule_id = rule.id
-            rule_description = rule.description
-            new_rule_description = f'{rule_id} {rule_description}'
-            rule.description = new_rule_description
     
     # Información sobre content vacío
     empty_content_count = 0
     empty_path_count = 0
     total_files = 0
     
+    # Una sola pasada por grupo: prefijo de ID en las reglas y conteo de archivos
     for group in groups:
+        # incluir id en la descripción de las reglas para que salgan en el informe
+        for rule in group.rules:
+            rule.description = f'{rule.id} {rule.description}'
+        
         for md_file in group.markdownfile:
             total_files += 1
             if not md_file.content:
@@ -8,42 +8,112 @@ import time
 from typing import Dict, Any, List, Optional, Tuple
 from urllib.parse import urlparse
 
+try:
+    # orjson (Rust) decodifica payloads grandes varias veces más rápido que json
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 import boto3
+from botocore.config import Config as BotoConfig
 from app.models import LambdaResult, MarkdownResponse
 
 
 from app.config import Config, setup_logger
 
 
+# Ubicaciones posibles del contenido en la respuesta de una lambda, por prioridad
+_CONTENT_KEYS = ('markdown', 'content', 'structure_markdown', 'body')
+
+# Prefijo que marca los archivos provenientes de la wiki del repositorio
+_WIKI_PREFIX = "(wiki) "
+_WIKI_PREFIX_LEN = len(_WIKI_PREFIX)
+
+# Límite de AWS para el payload de invocaciones asíncronas (InvocationType='Event')
+_ASYNC_PAYLOAD_LIMIT_BYTES = 256 * 1024
+
+# Conexiones HTTP reutilizables por cliente (>= hilos concurrentes que invocan lambdas)
+_MAX_POOL_CONNECTIONS = 50
+
+
 class LambdaInvoker:
     """Cliente para invocar Lambdas de AWS."""
     
+    __slots__ = (
+        'config', 'logger', 'lambda_client',
+        '_token', '_default_branch', '_region',
+        '_structure_lambda', '_reader_lambda', '_report_lambda', '_read_and_convert_lambda'
+    )
+    
+    # Clientes boto3 compartidos por (región, reintentos); se reutilizan entre invocaciones warm
+    _client_cache: Dict[Tuple[str, int], Any] = {}
+    
     def __init__(self, config=None):
         self.config = config or Config
         self.logger = setup_logger(self.__class__.__name__)
-        self.lambda_client = boto3.client('lambda', region_name=self.config.AWS_REGION)
+        
+        # Valores de configuración usados en cada invocación
+        self._token = self.config.GITHUB_TOKEN
+        self._default_branch = self.config.GITHUB_BRANCH
+        self._region = self.config.AWS_REGION
+        self._structure_lambda = self.config.GET_REPO_STRUCTURE_LAMBDA
+        self._reader_lambda = self.config.FILE_READER_LAMBDA
+        self._report_lambda = self.config.REPORT_LAMBDA
+        self._read_and_convert_lambda = self.config.READ_AND_CONVERT_LAMBDA
+        
+        max_attempts = self.config.MAX_RETRIES if self.config.ENABLE_RETRY else 0
+        self.lambda_client = self._get_lambda_client(self._region, max_attempts)
+    
+    @classmethod
+    def _get_lambda_client(cls, region: str, max_attempts: int):
+        """
+        Obtiene el cliente Lambda de la región, creándolo solo la primera vez.
+        
+        Los errores transitorios (throttling, 5xx) se reintentan dentro de botocore
+        con backoff exponencial en modo adaptativo. Las conexiones se mantienen vivas
+        y el pool se comparte entre los hilos que cargan documentos en paralelo.
+        """
+        cache_key = (region, max_attempts)
+        client = cls._client_cache.get(cache_key)
+        if client is None:
+            boto_config = BotoConfig(
+                retries={
+                    'max_attempts': max_attempts,
+                    'mode': 'adaptive'
+                },
+                tcp_keepalive=True,
+                max_pool_connections=_MAX_POOL_CONNECTIONS
+            )
+            client = boto3.client('lambda', region_name=region, config=boto_config)
+            cls._client_cache[cache_key] = client
+        return client
     
     # =============================================================================
     # MÉTODOS PRINCIPALES
     # =============================================================================
     
     def get_repository_structure(self, repository_url: str, branch: str = None) -> LambdaResult:
-        """Obtiene la estructura de un repositorio."""
-        branch = branch or self.config.GITHUB_BRANCH
+        """
+        Obtiene la estructura de un repositorio.
+        
+        El resultado no se cachea aquí: MarkdownConsumer mantiene el único cache
+        de estructuras (ya parseadas).
+        """
+        branch = branch or self._default_branch
         owner, repo = self._extract_owner_repo(repository_url)
 
         payload = {
             "operation": "GET_STRUCTURE",
             "provider": "github",
             "config": {
-                "token": self.config.GITHUB_TOKEN,
+                "token": self._token,
                 "owner": owner,
                 "repo": repo,
                 "branch": branch
             }
         }
         
-        return self._invoke_lambda(self.config.GET_REPO_STRUCTURE_LAMBDA, payload)
+        return self._invoke_lambda(self._structure_lambda, payload)
     
     def read_files(self, file_path: str, repository_url: str, branch: str = None) -> MarkdownResponse:
         """
@@ -57,28 +127,31 @@ class LambdaInvoker:
         Returns:
             MarkdownResponse: Resultado con el contenido Markdown procesado
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
 
-        branch = branch or self.config.GITHUB_BRANCH
+        branch = branch or self._default_branch
         owner, repo = self._extract_owner_repo(repository_url)
 
+        if self.supports_fused_reads:
+            return self._read_file_fused(file_path, owner, repo, branch, start_time)
+
         # 1. Descargar archivo en base64
         file_location = self._get_file_reference(file_path, owner, repo, branch)
         if not file_location:
             error_msg = f"No se pudo obtener el contenido del archivo '{file_path}'"
-            self.logger.error(f"❌ {error_msg}")
+            self.logger.error("❌ %s", error_msg)
             return MarkdownResponse(success=False, error=error_msg, source="get_file")
 
         # 2. Convertir a markdown
         markdown_content = self._convert_reference_to_markdown(file_path, file_location)
         if not markdown_content:
             error_msg = f"El archivo '{file_path}' no pudo ser convertido a Markdown"
-            self.logger.error(f"❌ {error_msg}")
+            self.logger.error("❌ %s", error_msg)
             return MarkdownResponse(success=False, error=error_msg, source="get_file")
 
-        self.logger.info(f"✅ Archivo '{file_path}' procesado correctamente")
+        self.logger.info("✅ Archivo '%s' procesado correctamente", file_path)
 
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
         return MarkdownResponse(
             success=True,
             markdown_content=markdown_content,
@@ -86,21 +159,151 @@ class LambdaInvoker:
             execution_time= execution_time
         )
     
+    @property
+    def supports_fused_reads(self) -> bool:
+        """Indica si está disponible la lambda que descarga y convierte en una sola invocación."""
+        return bool(self.config.ENABLE_FUSED_FILE_READ and self._read_and_convert_lambda)
+    
+    @property
+    def supports_batch_reads(self) -> bool:
+        """Indica si la lambda de lectura acepta la operación DOWNLOAD_AND_CONVERT_BATCH."""
+        return bool(self.config.ENABLE_BATCH_FILE_READ and self._read_and_convert_lambda)
+    
+    def read_files_batch(self, file_paths: List[str], repository_url: str,
+                         branch: str = None) -> LambdaResult:
+        """
+        Lee y convierte a Markdown varios archivos con una única invocación Lambda.
+        
+        La respuesta esperada tiene la forma {'files': {file_path: {'markdown': ...}}},
+        indexada por la ruta tal como se solicitó.
+        
+        Args:
+            file_paths: Rutas de los archivos dentro del repositorio
+            repository_url: URL del repositorio GitHub
+            branch: Rama del repositorio (opcional)
+            
+        Returns:
+            LambdaResult con la respuesta cruda de la lambda
+        """
+        branch = branch or self._default_branch
+        owner, repo = self._extract_owner_repo(repository_url)
+        
+        files = []
+        for file_path in file_paths:
+            clean_path, ismarkdown = self._parse_wiki_marker(self._strip_repo_prefix(file_path, repo))
+            files.append({"file_path": file_path, "path": clean_path, "ismarkdown": ismarkdown})
+        
+        payload = {
+            "operation": "DOWNLOAD_AND_CONVERT_BATCH",
+            "provider": "github",
+            "config": {
+                "token": self._token,
+                "owner": owner,
+                "repo": repo,
+                "branch": branch
+            },
+            "files": files,
+            "output_format": "markdown",
+            "ai_optimized": True
+        }
+        
+        return self._invoke_lambda(self._read_and_convert_lambda, payload)
+    
     def generate_report(self, report: str, 
                        repo_url : str) -> LambdaResult:
-        """Genera un reporte de validación."""
-        payload = {
+        """Genera un reporte de validación esperando la respuesta de la lambda."""
+        payload = self._build_report_payload(report, repo_url)
+        
+        return self._invoke_lambda(self._report_lambda, payload)
+    
+    def generate_report_async(self, report: str, repo_url: str) -> LambdaResult:
+        """
+        Dispara la generación del reporte sin esperar a que termine.
+        
+        Usa InvocationType='Event': la llamada retorna con el acuse de AWS y la
+        lambda de reporte publica su resultado por su cuenta. Si el payload supera
+        el límite de invocaciones asíncronas se usa la invocación síncrona.
+        
+        Args:
+            report: Contenido del reporte
+            repo_url: URL del repositorio analizado
+            
+        Returns:
+            LambdaResult con el request_id de la invocación en data
+        """
+        payload = self._build_report_payload(report, repo_url)
+        serialized = json.dumps(payload)
+        
+        if len(serialized.encode('utf-8')) > _ASYNC_PAYLOAD_LIMIT_BYTES:
+            self.logger.warning("⚠️ Reporte excede el límite de invocación asíncrona, se envía de forma síncrona")
+            return self._invoke_lambda(self._report_lambda, payload)
+        
+        return self._invoke_lambda_async(self._report_lambda, serialized)
+    
+    def _build_report_payload(self, report: str, repo_url: str) -> Dict[str, Any]:
+        """Construye el payload para la lambda de reportes."""
+        return {
             'report': report,
             'commit_message': f'Analysis made on repository {repo_url}',
             'timestamp': time.time()
         }
-        
-        return self._invoke_lambda(self.config.REPORT_LAMBDA, payload)
     
     # =============================================================================
     # MÉTODOS DE PROCESAMIENTO DE ARCHIVOS
     # =============================================================================
-    
+
+    def _read_file_fused(self, file_path: str, owner: str, repo: str, branch: str,
+                         start_time: float) -> MarkdownResponse:
+        """
+        Descarga y convierte un archivo a Markdown con una única invocación Lambda.
+
+        Evita el segundo round-trip (y el staging en S3) del flujo
+        descarga -> conversión.
+
+        Returns:
+            MarkdownResponse: Resultado con el contenido Markdown procesado
+        """
+        clean_path, ismarkdown = self._parse_wiki_marker(self._strip_repo_prefix(file_path, repo))
+        payload = {
+            "operation": "DOWNLOAD_AND_CONVERT",
+            "provider": "github",
+            "config": {
+                "token": self._token,
+                "owner": owner,
+                "repo": repo,
+                "branch": branch
+            },
+            "path": clean_path,
+            "ismarkdown": ismarkdown,
+            "output_format": "markdown",
+            "ai_optimized": True
+        }
+
+        result = self._invoke_lambda(self._read_and_convert_lambda, payload)
+
+        markdown_content = None
+        if result.success:
+            try:
+                processed_content = self._extract_content_from_result(result.data)
+                parsed_result = _json_loads(processed_content)
+                markdown_content = parsed_result.get("resultado", "").strip() or None
+            except Exception as e:
+                self.logger.error("❌ Error procesando respuesta de lectura y conversión: %s", e)
+
+        if not markdown_content:
+            error_msg = f"El archivo '{file_path}' no pudo ser convertido a Markdown"
+            self.logger.error("❌ %s", error_msg)
+            return MarkdownResponse(success=False, error=error_msg, source="get_file")
+
+        self.logger.info("✅ Archivo '%s' procesado correctamente", file_path)
+
+        return MarkdownResponse(
+            success=True,
+            markdown_content=markdown_content,
+            source="get_file",
+            execution_time=time.perf_counter() - start_time
+        )
+
     def _get_file_reference(self, file_path: str, owner: str, repo: str, branch: str) -> Optional[Dict[str,Any]]:
         """
         Descarga el archivo desde GitHub y extrae el contenido codificado en base64.
@@ -110,13 +313,12 @@ class LambdaInvoker:
             
         """
         
-        clean_path = file_path.removeprefix(f"{repo}/")
-        clean_path, ismarkdown = self._parse_wiki_marker(clean_path)
+        clean_path, ismarkdown = self._parse_wiki_marker(self._strip_repo_prefix(file_path, repo))
         payload = {
             "operation": "DOWNLOAD_FILE",
             "provider": "github",
             "config": {
-                "token": self.config.GITHUB_TOKEN,
+                "token": self._token,
                 "owner": owner,
                 "repo": repo,
                 "branch": branch
@@ -125,44 +327,56 @@ class LambdaInvoker:
             "ismarkdown": ismarkdown
         }
 
-        result = self._invoke_lambda(self.config.GET_REPO_STRUCTURE_LAMBDA, payload)
+        result = self._invoke_lambda(self._structure_lambda, payload)
 
         if not result.success:
-            self.logger.error(f"❌ Error al descargar archivo desde GitHub: {result.error}")
             return None
 
         try:
             raw_content = self._get_file_s3_location(result.data)
             return raw_content
         except Exception as e:
-            self.logger.error(f"❌ Error procesando respuesta de descarga: {e}")
+            self.logger.error("❌ Error procesando respuesta de descarga: %s", e)
             return None
         
-    def _parse_wiki_marker(path: str) :
+    @staticmethod
+    def _strip_repo_prefix(file_path: str, repo: str) -> str:
+        """Quita el prefijo '<repo>/' de la ruta sin construir el prefijo en cada llamada."""
+        repo_len = len(repo)
+        if file_path.startswith(repo) and file_path[repo_len:repo_len + 1] == '/':
+            return file_path[repo_len + 1:]
+        return file_path
+    
+    @staticmethod
+    def _parse_wiki_marker(path: str) -> Tuple[str, bool]:
         """
         Devuelve el path limpio y si es de wiki usando prefijo '(wiki) '
         """
         path = path.strip()
-        if path.lower().startswith("(wiki) "):
-            clean_path = path[len("(wiki) "):].strip()
-            return clean_path, True
+        # El chequeo de '(' evita el lower() en el caso común sin marcador
+        if path[:1] == '(' and path[:_WIKI_PREFIX_LEN].lower() == _WIKI_PREFIX:
+            return path[_WIKI_PREFIX_LEN:].lstrip(), True
         return path, False
     
     def _get_file_s3_location(self, lambda_data: dict) -> Dict[str, Any]:
         """
-        Extrae el contenido de la respuesta de la lambda.
+        Extrae la ubicación en S3 del archivo descargado por la lambda.
+        
+        El body llega serializado como JSON; se parsea una sola vez aquí para
+        que el resto del flujo trabaje con el diccionario.
         
         Args:
             lambda_data: Datos retornados por la lambda
             
         Returns:
-            Contenido como string
+            Diccionario con 's3_path' y 'bucket_name'
         """
         if not lambda_data:
-            return ""
+            return {}
         
-        # Buscar contenido en diferentes ubicaciones posibles
         obj_file_location = lambda_data["body"]
+        if isinstance(obj_file_location, (str, bytes)):
+            obj_file_location = _json_loads(obj_file_location)
         
         return obj_file_location
 
@@ -174,35 +388,34 @@ class LambdaInvoker:
             Contenido Markdown extraído, None si ocurre un error
         """
 
-        print(f"file location -> {file_location}")
-        print(f"tipe of file location -> {type(file_location)}")
+        self.logger.debug("Ubicación del archivo '%s': %r", file_path, file_location)
 
-        file_location = json.loads(file_location)
+        if not isinstance(file_location, dict):
+            self.logger.error("❌ Ubicación de archivo inválida para '%s'", file_path)
+            return None
 
-        
         file_name = Path(file_path).name
         payload = {
             "file_name": file_name,
             "s3_path": file_location['s3_path'],
             "bucket_name": file_location['bucket_name'],
-            "region": Config.AWS_REGION,
+            "region": self._region,
             "output_format": "markdown",
             "ai_optimized": "true"
         }
 
-        result = self._invoke_lambda(self.config.FILE_READER_LAMBDA, payload)
+        result = self._invoke_lambda(self._reader_lambda, payload)
 
         if not result.success:
-            self.logger.error(f"❌ Error al convertir archivo a Markdown: {result.error}")
             return None
 
         try:
             processed_content = self._extract_content_from_result(result.data)
-            parsed_result = json.loads(processed_content)
+            parsed_result = _json_loads(processed_content)
             markdown = parsed_result.get("resultado", "").strip()
             return markdown if markdown else None
         except Exception as e:
-            self.logger.error(f"❌ Error procesando respuesta del lector de archivos: {e}")
+            self.logger.error("❌ Error procesando respuesta del lector de archivos: %s", e)
             return None
     
     # =============================================================================
@@ -211,7 +424,7 @@ class LambdaInvoker:
     
     def _invoke_lambda(self, function_name: str, payload: Dict[str, Any]) -> LambdaResult:
         """Invoca una Lambda y retorna el resultado procesado."""
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         try:
             response = self.lambda_client.invoke(
@@ -220,46 +433,78 @@ class LambdaInvoker:
                 Payload=json.dumps(payload)
             )
             
-            response_payload = response['Payload'].read()
             status_code = response.get('StatusCode', 0)
-            
-            result_data = json.loads(response_payload) if response_payload else None
+            result_data = self._parse_payload(response['Payload'])
             
             success = (200 <= status_code < 300 and 
                       result_data is not None and
                       'errorMessage' not in result_data)
             
-            execution_time = time.time() - start_time
+            execution_time = time.perf_counter() - start_time
             
             if success:
-                return LambdaResult(
-                    success=True,
-                    data=result_data,
-                    execution_time=execution_time,
-                    lambda_name=function_name
-                )
-            else:
-                error_msg = result_data.get('errorMessage', 'Error desconocido') if result_data else 'No response'
-                return LambdaResult(
-                    success=False,
-                    error=error_msg,
-                    execution_time=execution_time,
-                    lambda_name=function_name
-                )
-                
+                return _success_result(result_data, execution_time, function_name)
+            
+            error_msg = result_data.get('errorMessage', 'Error desconocido') if result_data else 'No response'
+            self.logger.error("❌ Error en la lambda %s: %s", function_name, error_msg)
+            return _error_result(error_msg, execution_time, function_name)
+        
         except Exception as e:
+            # Para ClientError botocore ya agotó los reintentos configurados y
+            # _format_error_message incluye el código de error de AWS
             error_msg = self._format_error_message(e)
-            return LambdaResult(
-                success=False,
-                error=error_msg,
-                execution_time=time.time() - start_time,
-                lambda_name=function_name
+            self.logger.error("❌ Error invocando %s: %s", function_name, error_msg)
+            return _error_result(error_msg, time.perf_counter() - start_time, function_name)
+    
+    def _invoke_lambda_async(self, function_name: str, serialized_payload: str) -> LambdaResult:
+        """Invoca una Lambda en modo Event; AWS responde 202 al encolar el evento."""
+        start_time = time.perf_counter()
+        
+        try:
+            response = self.lambda_client.invoke(
+                FunctionName=function_name,
+                InvocationType='Event',
+                Payload=serialized_payload
             )
+            
+            status_code = response.get('StatusCode', 0)
+            request_id = response.get('ResponseMetadata', {}).get('RequestId')
+            
+            execution_time = time.perf_counter() - start_time
+            
+            if status_code == 202:
+                return _success_result({'request_id': request_id}, execution_time, function_name)
+            
+            error_msg = f"Status code inesperado: {status_code}"
+            self.logger.error("❌ Error en la invocación asíncrona de %s: %s", function_name, error_msg)
+            return _error_result(error_msg, execution_time, function_name)
+            
+        except Exception as e:
+            error_msg = self._format_error_message(e)
+            self.logger.error("❌ Error invocando %s: %s", function_name, error_msg)
+            return _error_result(error_msg, time.perf_counter() - start_time, function_name)
     
     # =============================================================================
     # MÉTODOS UTILITARIOS
     # =============================================================================
     
+    def _parse_payload(self, payload_stream) -> Optional[Dict[str, Any]]:
+        """
+        Decodifica el stream de respuesta de la lambda.
+        
+        Los bytes leídos solo viven dentro de esta función, de modo que el
+        buffer se libera en cuanto termina el parseo y no convive con el
+        resultado durante el resto de la invocación.
+        
+        Args:
+            payload_stream: StreamingBody retornado por boto3
+            
+        Returns:
+            Datos decodificados, None si la respuesta está vacía
+        """
+        raw = payload_stream.read()
+        return _json_loads(raw) if raw else None
+    
     def _extract_content_from_result(self, lambda_data: dict) -> str:
         """
         Extrae el contenido de la respuesta de la lambda.
@@ -273,17 +518,16 @@ class LambdaInvoker:
         if not lambda_data:
             return ""
         
-        # Buscar contenido en diferentes ubicaciones posibles
-        content_keys = ['markdown', 'content', 'structure_markdown', 'body']
-        
-        for key in content_keys:
-            if key in lambda_data:
-                return lambda_data[key]
-        
         # Si es string directamente
         if isinstance(lambda_data, str):
             return lambda_data
         
+        # Buscar contenido en diferentes ubicaciones posibles
+        for key in _CONTENT_KEYS:
+            content = lambda_data.get(key)
+            if content is not None:
+                return content
+        
         # Fallback
         return str(lambda_data)
     
@@ -301,8 +545,13 @@ class LambdaInvoker:
             ValueError: Si la URL no es válida
         """
         try:
-            parsed = urlparse(github_url)
-            parts = parsed.path.strip("/").split("/")
+            scheme_rest = github_url.split("://", 1)
+            if len(scheme_rest) == 2 and not any(c in github_url for c in "?#;"):
+                # Camino rápido sin urlparse: el path es lo que sigue al host, igual que parsed.path
+                path = scheme_rest[1].partition("/")[2]
+            else:
+                path = urlparse(github_url).path
+            parts = path.strip("/").split("/")
             
             if len(parts) >= 2:
                 owner, repo = parts[0], parts[1]
@@ -313,7 +562,7 @@ class LambdaInvoker:
             else:
                 raise ValueError(f"URL inválida de GitHub: {github_url}")
         except Exception as e:
-            self.logger.error(f"❌ Error procesando URL de GitHub: {e}")
+            self.logger.error("❌ Error procesando URL de GitHub: %s", e)
             raise ValueError(f"URL inválida de GitHub: {github_url}")
     
     def _format_error_message(self, error: Exception) -> str:
@@ -332,6 +581,21 @@ class LambdaInvoker:
             return f"Error: {str(error)}"
 
 
+# =============================================================================
+# FACTORIES DE RESULTADOS
+# =============================================================================
+
+def _success_result(data: Optional[Dict[str, Any]], execution_time: float,
+                    lambda_name: str) -> LambdaResult:
+    """Construye un LambdaResult exitoso."""
+    return LambdaResult(True, data, None, execution_time, lambda_name)
+
+
+def _error_result(error: str, execution_time: float, lambda_name: str) -> LambdaResult:
+    """Construye un LambdaResult fallido."""
+    return LambdaResult(False, None, error, execution_time, lambda_name)
+
+
 # =============================================================================
 # FUNCIÓN FACTORY
 # =============================================================================
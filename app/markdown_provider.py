@@ -2,15 +2,36 @@
 markdown_consumer.py - Consumidor de markdown desde lambdas AWS
 """
 
-import json
-from typing import Optional
-from dataclasses import dataclass
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from dataclasses import dataclass, replace
+
+try:
+    # orjson (Rust) decodifica payloads grandes varias veces más rápido que json
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
 
 from app.config import Config, setup_logger
-from app.lambda_invoker import create_lambda_invoker, LambdaResult
+from app.lambda_invoker import create_lambda_invoker, LambdaInvoker, LambdaResult
 from app.models import MarkdownResponse
 
 
+# Máximo de estructuras de repositorio cacheadas por consumidor
+STRUCTURE_CACHE_MAX_SIZE = 16
+
+# Máximo de lecturas individuales concurrentes cuando no hay lectura en lote
+FALLBACK_MAX_WORKERS = 8
+
+# Logger de módulo: se configura una sola vez para todas las instancias
+_LOGGER = setup_logger('MarkdownConsumer')
+
+# Invoker compartido entre consumidores: se reutiliza en invocaciones warm de la Lambda
+_SHARED_INVOKER: Optional[LambdaInvoker] = None
+
 
 class MarkdownConsumer:
     """
@@ -20,6 +41,10 @@ class MarkdownConsumer:
     Esta clase solo las invoca y retorna el resultado.
     """
     
+    # Ubicaciones posibles del markdown en las respuestas, por prioridad
+    _STRUCTURE_KEY_PRIORITY = ('markdown', 'content', 'structure_markdown', 'body')
+    _FILE_KEY_PRIORITY = ('markdown', 'content', 'body')
+    
     def __init__(self, config=None):
         """
         Inicializa el consumidor.
@@ -28,11 +53,28 @@ class MarkdownConsumer:
             config: Configuración opcional
         """
         self.config = config or Config
-        self.logger = setup_logger(self.__class__.__name__)
-        self.lambda_invoker = create_lambda_invoker(config)
+        self.logger = _LOGGER
+        self.lambda_invoker = self._get_shared_invoker(self.config)
+        
+        # Valores de configuración usados en cada lectura: se resuelven una sola vez
+        self._default_branch = self.config.GITHUB_BRANCH
+        self._cache_ttl_seconds = self.config.REPO_CACHE_TTL_SECONDS
+        # El cache de estructuras es opcional: solo se usa con un TTL explícito mayor que 0
+        self._caching_enabled = self.config.ENABLE_CACHING and self._cache_ttl_seconds > 0
+        
+        # (repository_url, branch) -> (expira_en, MarkdownResponse), en orden LRU
+        self._structure_cache: "OrderedDict[Tuple[str, str], Tuple[float, MarkdownResponse]]" = OrderedDict()
         
         self.logger.info("🚀 MarkdownConsumer inicializado")
     
+    @staticmethod
+    def _get_shared_invoker(config) -> LambdaInvoker:
+        """Retorna el invoker de módulo, recreándolo solo si cambia la configuración."""
+        global _SHARED_INVOKER
+        if _SHARED_INVOKER is None or _SHARED_INVOKER.config is not config:
+            _SHARED_INVOKER = create_lambda_invoker(config)
+        return _SHARED_INVOKER
+    
     def get_repository_structure_markdown(self, repository_url: str, 
                                         branch: str = None) -> MarkdownResponse:
         """
@@ -48,38 +90,46 @@ class MarkdownConsumer:
         Returns:
             MarkdownResponse: Respuesta con el markdown de la estructura
         """
-        branch = branch or self.config.GITHUB_BRANCH
+        branch = branch or self._default_branch
+        
+        cached = self._get_cached_structure(repository_url, branch)
+        if cached is not None:
+            self.logger.info("🎯 Estructura markdown de %s obtenida desde cache", repository_url)
+            return cached
         
-        self.logger.info(f"📂 Obteniendo estructura markdown de {repository_url}")
+        self.logger.info("📂 Obteniendo estructura markdown de %s", repository_url)
         
         # Invocar lambda que retorna markdown de estructura
+        # La estructura parseada se cachea aquí (único cache de estructuras)
         lambda_result = self.lambda_invoker.get_repository_structure(
             repository_url=repository_url,
             branch=branch
         )
         
         if lambda_result.success:
-            # Extraer markdown del resultado
-            content = self._extract_markdown_from_result(lambda_result.data)
-            lambda_data = json.loads(content)
+            lambda_data = self._parse_structure_payload(lambda_result.data)
 
-
-            self.logger.info(f"✅ Estructura markdown obtenida en {lambda_result.execution_time:.2f}s")
+            self.logger.info("✅ Estructura markdown obtenida en %.2fs", lambda_result.execution_time)
             
             markdown_content = lambda_data.get("markdown", {})
             files = lambda_data.get("archivos", [])
+            
+            # Liberar el payload crudo (posiblemente varios MB) antes de construir la respuesta
+            del lambda_data
+            lambda_result.data = None
 
 
-            return MarkdownResponse(
+            response = MarkdownResponse(
                 success=True,
                 markdown_content=markdown_content,
                 files=files,
                 execution_time=lambda_result.execution_time,
                 source="structure"
             )
-        else:
-            self.logger.error(f"❌ Error obteniendo estructura: {lambda_result.error}")
+            self._cache_structure(repository_url, branch, response)
             
+            return response
+        else:
             return MarkdownResponse(
                 success=False,
                 error=lambda_result.error,
@@ -87,6 +137,30 @@ class MarkdownConsumer:
                 source="structure"
             )
     
+    def _parse_structure_payload(self, lambda_data) -> dict:
+        """
+        Obtiene el dict {'markdown': ..., 'archivos': [...]} de la respuesta de estructura.
+        
+        El contrato normal es que la lambda retorne ese dict directamente (o anidado
+        bajo una de las claves conocidas). Solo se decodifica JSON cuando el contenido
+        llega serializado como str/bytes (formato legado).
+        
+        Raises:
+            ValueError: Si la respuesta no contiene una estructura reconocible
+        """
+        content = lambda_data
+        if isinstance(lambda_data, dict):
+            if "archivos" in lambda_data:
+                return lambda_data
+            content = self._first_present(lambda_data, self._STRUCTURE_KEY_PRIORITY)
+        
+        if isinstance(content, dict):
+            return content
+        if isinstance(content, (str, bytes, bytearray)) and content:
+            return _json_loads(content)
+        
+        raise ValueError("Respuesta de estructura sin contenido reconocible")
+    
     def get_file_markdown(self, file_path: str, repository_url: str, 
                          branch: str = None) -> MarkdownResponse:
         """
@@ -103,9 +177,9 @@ class MarkdownConsumer:
         Returns:
             MarkdownResponse: Respuesta con el markdown del archivo
         """
-        branch = branch or self.config.GITHUB_BRANCH
+        branch = branch or self._default_branch
         
-        self.logger.info(f"📄 Obteniendo markdown del archivo {file_path}")
+        self.logger.info("📄 Obteniendo markdown del archivo %s", file_path)
         
         # Invocar lambda que retorna markdown del archivo
         result = self.lambda_invoker.read_files(
@@ -124,8 +198,6 @@ class MarkdownConsumer:
                 source="file"
             )
         else:
-            self.logger.error(f"❌ Error obteniendo archivo {file_path}: {result.error}")
-            
             return MarkdownResponse(
                 success=False,
                 error=result.error,
@@ -133,6 +205,124 @@ class MarkdownConsumer:
                 source="file"
             )
     
+    @property
+    def supports_batch_reads(self) -> bool:
+        """Indica si get_files_markdown puede resolver varios archivos en una sola invocación."""
+        return self.lambda_invoker.supports_batch_reads
+    
+    def get_files_markdown(self, file_paths: List[str], repository_url: str,
+                           branch: str = None) -> Dict[str, MarkdownResponse]:
+        """
+        Obtiene el markdown de varios archivos.
+        
+        Si la lectura en lote (ENABLE_BATCH_FILE_READ) está habilitada se resuelven
+        todos con una sola invocación; los archivos que no vengan en la respuesta (o si la
+        invocación falla o no hay lectura en lote) se obtienen con get_file_markdown,
+        en paralelo.
+        
+        Args:
+            file_paths: Rutas de los archivos en el repositorio
+            repository_url: URL del repositorio
+            branch: Rama a analizar (opcional)
+            
+        Returns:
+            Dict[str, MarkdownResponse]: Respuesta por cada ruta solicitada
+        """
+        branch = branch or self._default_branch
+        responses: Dict[str, MarkdownResponse] = {}
+        
+        if self.supports_batch_reads and len(file_paths) > 1:
+            self.logger.info("📄 Obteniendo markdown de %d archivos en lote", len(file_paths))
+            result = self.lambda_invoker.read_files_batch(file_paths, repository_url, branch)
+            
+            if result.success and isinstance(result.data, dict) and isinstance(result.data.get('files'), dict):
+                batch_files = result.data['files']
+                for file_path in file_paths:
+                    # Entradas ausentes, vacías o con error se resuelven con la lectura individual
+                    markdown = self._extract_batch_entry_markdown(batch_files.get(file_path))
+                    if markdown:
+                        responses[file_path] = MarkdownResponse(
+                            success=True,
+                            markdown_content=markdown,
+                            execution_time=result.execution_time,
+                            source="file"
+                        )
+            else:
+                self.logger.warning("⚠️ Lectura en lote sin respuesta válida, se usa lectura individual")
+        
+        pending = [file_path for file_path in file_paths if file_path not in responses]
+        if len(pending) > 1:
+            with ThreadPoolExecutor(max_workers=min(FALLBACK_MAX_WORKERS, len(pending))) as executor:
+                results = executor.map(
+                    lambda file_path: self.get_file_markdown(file_path, repository_url, branch),
+                    pending
+                )
+                responses.update(zip(pending, results))
+        elif pending:
+            responses[pending[0]] = self.get_file_markdown(pending[0], repository_url, branch)
+        
+        # Respetar el orden de las rutas solicitadas
+        return {file_path: responses[file_path] for file_path in file_paths}
+    
+    def _get_cached_structure(self, repository_url: str, branch: str) -> Optional[MarkdownResponse]:
+        """
+        Retorna una copia de la estructura cacheada si existe y no ha expirado.
+        
+        Args:
+            repository_url: URL del repositorio
+            branch: Rama analizada
+            
+        Returns:
+            MarkdownResponse cacheado o None
+        """
+        if not self._caching_enabled:
+            return None
+        
+        cache_key = (repository_url, branch)
+        entry = self._structure_cache.get(cache_key)
+        if entry is None:
+            return None
+        
+        expires_at, response = entry
+        if expires_at <= time.monotonic():
+            del self._structure_cache[cache_key]
+            return None
+        
+        self._structure_cache.move_to_end(cache_key)
+        return self._copy_structure(response, execution_time=0.0)
+    
+    def _cache_structure(self, repository_url: str, branch: str, response: MarkdownResponse) -> None:
+        """
+        Guarda la estructura en el cache, descartando la menos usada si se llena.
+        
+        Args:
+            repository_url: URL del repositorio
+            branch: Rama analizada
+            response: Respuesta exitosa a cachear
+        """
+        if not self._caching_enabled:
+            return
+        
+        cache_key = (repository_url, branch)
+        expires_at = time.monotonic() + self._cache_ttl_seconds
+        # Se guarda una copia: el llamador conserva la respuesta original y puede modificarla
+        self._structure_cache[cache_key] = (expires_at, self._copy_structure(response))
+        self._structure_cache.move_to_end(cache_key)
+        
+        if len(self._structure_cache) > STRUCTURE_CACHE_MAX_SIZE:
+            self._structure_cache.popitem(last=False)
+    
+    @staticmethod
+    def _copy_structure(response: MarkdownResponse, **changes) -> MarkdownResponse:
+        """Copia la respuesta con su propia lista de archivos, para no compartirla con el cache."""
+        if response.files is not None:
+            changes['files'] = list(response.files)
+        return replace(response, **changes)
+    
+    def clear_structure_cache(self) -> None:
+        """Limpia el cache de estructuras de repositorio."""
+        self._structure_cache.clear()
+    
     def _extract_markdown_from_result(self, lambda_data: dict) -> str:
         """
         Extrae el contenido markdown de la respuesta de la lambda de estructura.
@@ -146,21 +336,15 @@ class MarkdownConsumer:
         if not lambda_data:
             return ""
         
-        # Posibles ubicaciones del markdown en la respuesta
-        if 'markdown' in lambda_data:
-            return lambda_data['markdown']
-        elif 'content' in lambda_data:
-            return lambda_data['content']
-        elif 'structure_markdown' in lambda_data:
-            return lambda_data['structure_markdown']
-        elif 'body' in lambda_data:
-            return lambda_data['body']
-        elif isinstance(lambda_data, str):
-            # Si la lambda retorna directamente el markdown como string
+        # Si la lambda retorna directamente el markdown como string
+        if isinstance(lambda_data, str):
             return lambda_data
-        else:
-            # Fallback: convertir a string si no encuentra formato conocido
-            return str(lambda_data)
+        
+        # Posibles ubicaciones del markdown en la respuesta
+        content = self._first_present(lambda_data, self._STRUCTURE_KEY_PRIORITY)
+        
+        # Fallback: convertir a string si no encuentra formato conocido
+        return content if content is not None else str(lambda_data)
     
     def _extract_file_markdown_from_result(self, lambda_data: dict, 
                                          file_path: str) -> str:
@@ -177,36 +361,57 @@ class MarkdownConsumer:
         if not lambda_data:
             return ""
         
-        # Si la lambda retorna múltiples archivos
-        if 'files' in lambda_data and isinstance(lambda_data['files'], dict):
-            file_data = lambda_data['files'].get(file_path, {})
-            
-            # Buscar markdown en diferentes ubicaciones
-            if 'markdown' in file_data:
-                return file_data['markdown']
-            elif 'content' in file_data:
-                return file_data['content']
-            elif 'body' in file_data:
-                return file_data['body']
-        
-        # Si retorna directamente el contenido
-        elif 'markdown' in lambda_data:
-            return lambda_data['markdown']
-        elif 'content' in lambda_data:
-            return lambda_data['content']
-        elif 'body' in lambda_data:
-            return lambda_data['body']
-        elif isinstance(lambda_data, str):
-            # Si la lambda retorna directamente el markdown
+        # Si la lambda retorna directamente el markdown
+        if isinstance(lambda_data, str):
             return lambda_data
         
+        # Si la lambda retorna múltiples archivos
+        files = lambda_data.get('files')
+        if isinstance(files, dict):
+            content = self._first_present(files.get(file_path, {}), self._FILE_KEY_PRIORITY)
+        else:
+            # Si retorna directamente el contenido
+            content = self._first_present(lambda_data, self._FILE_KEY_PRIORITY)
+        
         # Fallback
-        return str(lambda_data)
+        return content if content is not None else str(lambda_data)
+    
+    @classmethod
+    def _extract_batch_entry_markdown(cls, entry) -> Optional[str]:
+        """
+        Extrae el markdown de una entrada de la respuesta en lote.
+        
+        Solo se acepta un str no vacío o un dict con una clave de contenido no vacía;
+        cualquier otra entrada (p. ej. {"error": ...}) retorna None para que el
+        archivo se lea de forma individual.
+        
+        Args:
+            entry: Valor de `files[ruta]` en la respuesta en lote
+            
+        Returns:
+            Contenido markdown del archivo o None
+        """
+        if isinstance(entry, str):
+            return entry or None
+        if isinstance(entry, dict):
+            content = cls._first_present(entry, cls._FILE_KEY_PRIORITY)
+            if isinstance(content, str) and content:
+                return content
+        return None
+    
+    @staticmethod
+    def _first_present(data: dict, keys: Tuple[str, ...]) -> Optional[str]:
+        """Retorna el valor de la primera clave presente en data, o None."""
+        return next((data[key] for key in keys if key in data), None)
 
 
+@lru_cache(maxsize=1)
 def create_markdown_consumer(config=None) -> MarkdownConsumer:
     """
-    Crea una instancia de MarkdownConsumer.
+    Crea (una sola vez) la instancia compartida de MarkdownConsumer.
+    
+    Las invocaciones warm de la Lambda reutilizan el mismo consumidor,
+    evitando reconstruir el logger y el invoker en cada request.
     
     Args:
         config: Configuración opcional
@@ -1,36 +1,56 @@
-from typing import List, Dict, Set, Tuple
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain
+from typing import Callable, List, Dict, FrozenSet, Iterable, Iterator, Optional, Pattern, Set, Tuple, Union
 
 from app.models import MarkdownDocument, RuleData
 import fnmatch
 import logging
+import re
+import sys
+import threading
 
 from app.markdown_provider import MarkdownConsumer
 
 logger = logging.getLogger(__name__)
 
+# Máximo de archivos cargados en paralelo (cada carga es una invocación Lambda)
+DEFAULT_MAX_WORKERS = 8
+
+# Máximo de documentos retenidos por DocumentCache; None = sin límite. Cada binder (y su
+# cache) vive una sola ejecución, así que acotarlo solo provocaría recargas a mitad del run
+DEFAULT_CACHE_MAX_SIZE: Optional[int] = None
+
 
 class LogMessages:
-    """Constantes para mensajes de logging consistentes."""
-    
-    RULE_INVALID = "[⚠️] Regla '{rule_id}' sin referencias válidas. Se omite."
-    RULE_NO_SOURCES = "[ℹ️] No se encontraron archivos fuente para la regla '{rule_id}'."
-    RULE_NO_VALID_FILES = "[ℹ️] Regla '{rule_id}' sin archivos válidos después de filtrar duplicados. Se omite."
-    RULE_DUPLICATED_FILES = "[⚠️] Regla '{rule_id}' ignorará {count} archivo(s) ya usado(s): {files}"
-    RULE_PROCESSING_ERROR = "[❌] Error crítico procesando la regla '{rule_id}': {error}"
-    MARKDOWN_LOAD_ERROR = "[❌] Error cargando archivo Markdown '{path}': {error}"
-    CACHE_HIT = "[🎯] Cache hit para archivo '{path}'"
-    CACHE_MISS = "[📁] Cache miss para archivo '{path}' - cargando desde proveedor"
-    PROCESSING_COMPLETE = "[✅] Procesamiento completado: {processed}/{total} reglas exitosas"
-    CACHE_STATS = "[📊] Cache stats: {cached_docs} documentos únicos cargados"
+    """
+    Constantes para mensajes de logging consistentes.
+    
+    Usan argumentos posicionales estilo %: logging solo formatea el mensaje
+    si el registro se emite.
+    """
+    
+    RULE_INVALID = "[⚠️] Regla '%s' sin referencias válidas. Se omite."
+    RULE_NO_SOURCES = "[ℹ️] No se encontraron archivos fuente para la regla '%s'."
+    RULE_PROCESSING_ERROR = "[❌] Error crítico procesando la regla '%s': %s"
+    MARKDOWN_LOAD_ERROR = "[❌] Error cargando archivo Markdown '%s': %s"
+    CACHE_HIT = "[🎯] Cache hit para archivo '%s'"
+    CACHE_MISS = "[📁] Cache miss para archivo '%s' - cargando desde proveedor"
+    PROCESSING_COMPLETE = "[✅] Procesamiento completado: %d/%d reglas exitosas"
+    CACHE_STATS = "[📊] Cache stats: %d documentos únicos cargados"
     CACHE_CLEARED = "[🧹] Cache limpiado - memoria liberada"
     
     # Mensajes detallados para mejor trazabilidad
-    RULE_PROCESSING_START = "[🔄] Iniciando procesamiento de regla '{rule_id}'"
-    RULE_FOUND_TARGETS = "[📂] Regla '{rule_id}' encontró {count} archivo(s): {files}"
-    RULE_LOADING_DOCUMENTS = "[📥] Regla '{rule_id}' cargando {count} documento(s)..."
-    RULE_DOCUMENTS_LOADED = "[✅] Regla '{rule_id}' cargó exitosamente {count} archivo(s): {files}"
-    RULE_PROCESSING_SUCCESS = "[🎯] Regla '{rule_id}' procesada exitosamente con {count} archivo(s)"
-    RULE_PROCESSING_SKIPPED = "[⏭️] Regla '{rule_id}' omitida - sin archivos válidos"
+    RULE_PROCESSING_START = "[🔄] Iniciando procesamiento de regla '%s'"
+    RULE_FOUND_TARGETS = "[📂] Regla '%s' encontró %d archivo(s): %s"
+    RULE_LOADING_DOCUMENTS = "[📥] Regla '%s' cargando %d documento(s)..."
+    RULE_DOCUMENTS_LOADED = "[✅] Regla '%s' cargó exitosamente %d archivo(s): %s"
+    RULE_PROCESSING_SUCCESS = "[🎯] Regla '%s' procesada exitosamente con %d archivo(s)"
+    RULE_PROCESSING_SKIPPED = "[⏭️] Regla '%s' omitida - sin archivos válidos"
+    PREFETCH_START = "[📥] Precargando %d archivo(s) únicos de %d regla(s)"
 
 
 class DocumentCache:
@@ -38,31 +58,35 @@ class DocumentCache:
     Cache de documentos Markdown para evitar cargas duplicadas.
     
     Mantiene los documentos ya cargados en memoria para reutilización
-    entre múltiples reglas que requieren los mismos archivos.
+    entre múltiples reglas que requieren los mismos archivos. Los documentos
+    no cacheados se cargan en paralelo (cada carga es una invocación Lambda).
+    El cache vive lo que dura una ejecución del binder; por defecto no tiene
+    límite (opcionalmente puede acotarse como LRU con `max_size`).
     """
     
-    def __init__(self, markdown_provider: MarkdownConsumer):
+    __slots__ = ('markdown_provider', 'max_workers', 'max_size', 'evictions',
+                 '_cache', '_inflight', '_lock')
+    
+    def __init__(self, markdown_provider: MarkdownConsumer, max_workers: int = DEFAULT_MAX_WORKERS,
+                 max_size: Optional[int] = DEFAULT_CACHE_MAX_SIZE):
         """
         Inicializa el cache con el proveedor de documentos.
         
         Args:
             markdown_provider: Objeto que implementa get_file_markdown(path, repo_url)
+            max_workers: Máximo de archivos a cargar en paralelo
+            max_size: Máximo de documentos retenidos (None = sin límite); si se
+                alcanza, se descartan los menos usados
         """
         self.markdown_provider = markdown_provider
-        self._cache: Dict[str, MarkdownDocument] = {}
-    
-    def _generate_cache_key(self, path: str, repository_url: str) -> str:
-        """
-        Genera una clave única para el cache basada en la ruta y repositorio.
-        
-        Args:
-            path: Ruta del archivo
-            repository_url: URL del repositorio
-            
-        Returns:
-            Clave única para el cache
-        """
-        return f"{repository_url}:{path}"
+        self.max_workers = max_workers
+        self.max_size = max_size
+        self.evictions = 0
+        # Claves (repository_url, path): su hash combina los hashes ya calculados de ambas cadenas
+        self._cache: "OrderedDict[Tuple[str, str], MarkdownDocument]" = OrderedDict()
+        # Cargas en curso: clave -> Future compartido por los hilos que piden el mismo archivo
+        self._inflight: Dict[Tuple[str, str], Future] = {}
+        self._lock = threading.Lock()
     
     def get_document(self, path: str, repository_url: str) -> MarkdownDocument:
         """
@@ -78,13 +102,27 @@ class DocumentCache:
         Raises:
             Exception: Si hay error cargando el archivo
         """
-        cache_key = self._generate_cache_key(path, repository_url)
+        cache_key = (repository_url, path)
         
-        if cache_key in self._cache:
-            logger.debug(LogMessages.CACHE_HIT.format(path=path))
-            return self._cache[cache_key]
+        with self._lock:
+            document = self._cache.get(cache_key)
+            if document is not None:
+                self._cache.move_to_end(cache_key)
+                logger.debug(LogMessages.CACHE_HIT, path)
+                return document
+            
+            # Si otro hilo ya está cargando este archivo, esperar su resultado
+            pending = self._inflight.get(cache_key)
+            if pending is None:
+                pending = self._inflight[cache_key] = Future()
+                is_owner = True
+            else:
+                is_owner = False
         
-        logger.debug(LogMessages.CACHE_MISS.format(path=path))
+        if not is_owner:
+            return pending.result()
+        
+        logger.debug(LogMessages.CACHE_MISS, path)
         
         try:
             markdown_result = self.markdown_provider.get_file_markdown(path, repository_url)
@@ -92,14 +130,19 @@ class DocumentCache:
                 path=path,
                 content=markdown_result.markdown_content
             )
-            
-            # Guardar en cache para futuras consultas
-            self._cache[cache_key] = document
-            return document
-            
         except Exception as e:
-            logger.error(LogMessages.MARKDOWN_LOAD_ERROR.format(path=path, error=str(e)))
+            logger.error(LogMessages.MARKDOWN_LOAD_ERROR, path, e)
+            with self._lock:
+                self._inflight.pop(cache_key, None)
+            pending.set_exception(e)
             raise
+        
+        # Guardar en cache para futuras consultas
+        with self._lock:
+            self._store(cache_key, document)
+            self._inflight.pop(cache_key, None)
+        pending.set_result(document)
+        return document
     
     def get_documents(self, paths: List[str], repository_url: str) -> Dict[str, MarkdownDocument]:
         """
@@ -115,11 +158,126 @@ class DocumentCache:
         Raises:
             Exception: Si hay error cargando cualquier archivo
         """
-        return {path: self.get_document(path, repository_url) for path in paths}
+        documents, misses = self.lookup(paths, repository_url)
+        
+        if len(misses) > 1 and self._provider_supports_batch():
+            # Una sola invocación para todo el lote; lo que falte se carga abajo
+            self._load_batch(misses, repository_url, documents)
+            misses = [path for path in misses if documents[path] is None]
+        elif len(misses) > 1 and self.max_workers > 1:
+            self._load_parallel(misses, repository_url, documents)
+            return documents
+        
+        for path in misses:
+            documents[path] = self.get_document(path, repository_url)
+        
+        return documents
+    
+    def _provider_supports_batch(self) -> bool:
+        """
+        Indica si el proveedor expone get_files_markdown con lectura real en lote.
+        
+        Los proveedores sin el flag supports_batch_reads se consideran de lote si
+        implementan get_files_markdown.
+        """
+        provider = self.markdown_provider
+        return getattr(provider, 'supports_batch_reads', hasattr(provider, 'get_files_markdown'))
+    
+    def _load_parallel(self, paths: List[str], repository_url: str,
+                       documents: Dict[str, MarkdownDocument]) -> None:
+        """
+        Carga en paralelo documentos no cacheados y los asigna en `documents`.
+        
+        Args:
+            paths: Rutas no presentes en el cache
+            repository_url: URL del repositorio
+            documents: Diccionario de resultado a completar
+            
+        Raises:
+            Exception: Si hay error cargando cualquier archivo
+        """
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(paths))) as executor:
+            futures = {
+                executor.submit(self.get_document, path, repository_url): path
+                for path in paths
+            }
+            try:
+                for future in as_completed(futures):
+                    documents[futures[future]] = future.result()
+            except Exception:
+                for future in futures:
+                    future.cancel()
+                raise
+    
+    def lookup(self, paths: List[str], repository_url: str) -> Tuple[Dict[str, MarkdownDocument], List[str]]:
+        """
+        Resuelve desde el cache, en una sola pasada, los documentos ya cargados.
+        
+        El diccionario se crea de una vez con todas las rutas (en el orden de `paths`);
+        las rutas no cacheadas quedan con valor None y se retornan como misses.
+        
+        Args:
+            paths: Lista de rutas de archivos
+            repository_url: URL del repositorio
+            
+        Returns:
+            Tuple con (ruta -> MarkdownDocument o None, lista de rutas no cacheadas)
+        """
+        documents: Dict[str, MarkdownDocument] = dict.fromkeys(paths)
+        misses = []
+        with self._lock:
+            for path in documents:
+                cache_key = (repository_url, path)
+                document = self._cache.get(cache_key)
+                if document is None:
+                    misses.append(path)
+                else:
+                    self._cache.move_to_end(cache_key)
+                    documents[path] = document
+        return documents, misses
+    
+    def _store(self, cache_key: Tuple[str, str], document: MarkdownDocument) -> None:
+        """Inserta un documento como el más reciente y, si hay límite, descarta los menos usados (requiere el lock)."""
+        self._cache[cache_key] = document
+        self._cache.move_to_end(cache_key)
+        if self.max_size is None:
+            return
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+            self.evictions += 1
+    
+    def _load_batch(self, paths: List[str], repository_url: str,
+                    documents: Dict[str, MarkdownDocument]) -> None:
+        """
+        Carga varios documentos con una sola llamada al proveedor.
+        
+        Args:
+            paths: Rutas no presentes en el cache
+            repository_url: URL del repositorio
+            documents: Diccionario de resultado a completar (y el cache)
+            
+        Raises:
+            Exception: Si hay error cargando el lote
+        """
+        try:
+            responses = self.markdown_provider.get_files_markdown(paths, repository_url)
+        except Exception as e:
+            logger.error(LogMessages.MARKDOWN_LOAD_ERROR, paths, e)
+            raise
+        
+        with self._lock:
+            for path, markdown_result in responses.items():
+                document = MarkdownDocument(
+                    path=path,
+                    content=markdown_result.markdown_content
+                )
+                documents[path] = document
+                self._store((repository_url, path), document)
     
     def clear_cache(self) -> None:
         """Limpia el cache liberando memoria. Útil para optimización en Lambda."""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
         logger.info(LogMessages.CACHE_CLEARED)
     
     def get_cache_stats(self) -> Dict[str, int]:
@@ -131,7 +289,9 @@ class DocumentCache:
         """
         return {
             'cached_documents': len(self._cache),
-            'total_memory_items': len(self._cache)
+            'total_memory_items': len(self._cache),
+            'max_size': self.max_size,
+            'evictions': self.evictions
         }
 
 
@@ -145,14 +305,12 @@ def is_rule_valid(rule: RuleData) -> bool:
     Returns:
         bool: True si la regla tiene al menos una referencia válida
     """
-    return (
-        rule.references and 
-        len(rule.references) > 0 and 
-        rule.references[0].strip()
-    )
+    references = rule.references
+    # isspace() sobre toda la cadena: equivale a strip() sin crear una copia
+    return bool(references) and not references.isspace()
 
 
-def extract_patterns_from_rule(rule: RuleData) -> Tuple[str, List[str]]:
+def extract_patterns_from_rule(rule: RuleData) -> Tuple[str, Tuple[str, ...]]:
     """
     Extrae los patrones de búsqueda de una regla.
     
@@ -163,19 +321,20 @@ def extract_patterns_from_rule(rule: RuleData) -> Tuple[str, List[str]]:
         rule: Regla de la cual extraer patrones
         
     Returns:
-        Tuple con (patrón_fuente, lista_patrones_destino)
+        Tuple con (patrón_fuente, tupla_patrones_destino)
     """
-    source_pattern = rule.parsed_references[0]
-    destiny_patterns = [r.strip() for r in rule.parsed_references[1:]] if len(rule.parsed_references) > 1 else []
-    return source_pattern, destiny_patterns
+    references = rule.parsed_references
+    if not references:
+        return "", ()
+    return references[0], references[1:]
 
 
-def find_matching_paths(paths: List[str], patterns: List[str]) -> List[str]:
+def find_matching_paths(paths: Union[List[str], 'PathIndex'], patterns: List[str]) -> List[str]:
     """
     Encuentra todas las rutas que coincidan con cualquiera de los patrones dados.
     
     Args:
-        paths: Lista de rutas disponibles
+        paths: Lista de rutas disponibles, o un PathIndex construido sobre ellas
         patterns: Lista de patrones de búsqueda (estilo Unix glob)
         
     Returns:
@@ -184,12 +343,157 @@ def find_matching_paths(paths: List[str], patterns: List[str]) -> List[str]:
     if not patterns:
         return []
     
-    matching_paths = []
-    for path in paths:
-        if any(fnmatch.fnmatch(path, pattern) for pattern in patterns):
-            matching_paths.append(path)
+    if isinstance(paths, PathIndex):
+        return paths.match(patterns)
     
-    return matching_paths
+    # Patrones repetidos no aportan coincidencias y alargan la alternancia de la regex
+    return _compile_matcher(tuple(dict.fromkeys(patterns)))(paths)
+
+
+@lru_cache(maxsize=512)
+def _compile_matcher(patterns: Tuple[str, ...]) -> Callable[[Iterable[str]], List[str]]:
+    """
+    Construye un filtro especializado para una combinación de patrones.
+    
+    Los patrones literales (sin comodines) se resuelven con un frozenset y solo
+    los patrones glob se evalúan con la regex combinada; el filtro se cachea y
+    se reutiliza en cada invocación warm con el mismo conjunto de reglas.
+    
+    Args:
+        patterns: Patrones glob sin duplicados
+        
+    Returns:
+        Función que filtra una secuencia de rutas conservando su orden
+    """
+    literals = frozenset(pattern for pattern in patterns if _GLOB_CHARS.isdisjoint(pattern))
+    globs = tuple(pattern for pattern in patterns if pattern not in literals)
+    
+    if not globs:
+        return lambda paths: [path for path in paths if path in literals]
+    
+    match = _compile_patterns(globs).match
+    if not literals:
+        return lambda paths: [path for path in paths if match(path)]
+    return lambda paths: [path for path in paths if path in literals or match(path)]
+
+
+@lru_cache(maxsize=512)
+def _compile_patterns(patterns: Tuple[str, ...]) -> Pattern[str]:
+    """
+    Une los patrones glob en una sola expresión regular compilada.
+    
+    Equivale a fnmatch.fnmatch sobre cada patrón (sensible a mayúsculas, como en Lambda),
+    pero traduce y compila una sola vez por combinación de patrones. fnmatch.translate
+    ya emite grupos sin retroceso exponencial para comodines '*' consecutivos, de modo
+    que el coste por ruta crece de forma lineal con el número de patrones.
+    """
+    return re.compile('|'.join(f'(?:{fnmatch.translate(pattern)})' for pattern in patterns))
+
+
+_GLOB_CHARS = frozenset('*?[')
+
+
+def _extension_of_pattern(pattern: str) -> Optional[str]:
+    """
+    Retorna la extensión de un patrón de la forma '*.ext' (sin comodines en 'ext'),
+    o None si el patrón requiere evaluación completa.
+    """
+    if not pattern.startswith('*.'):
+        return None
+    extension = pattern[2:]
+    if not extension or '.' in extension or '/' in extension or _GLOB_CHARS.intersection(extension):
+        return None
+    return extension
+
+
+def _literal_prefix(pattern: str) -> str:
+    """Retorna la parte inicial del patrón anterior al primer comodín."""
+    for index, char in enumerate(pattern):
+        if char in _GLOB_CHARS:
+            return pattern[:index]
+    return pattern
+
+
+# Mayor code point: acota por arriba la ventana de rutas con un prefijo dado
+_MAX_CHAR = chr(0x10FFFF)
+
+
+class PathIndex:
+    """
+    Índice de rutas construido una sola vez por ejecución.
+    
+    Resuelve patrones literales (sin comodines) con una búsqueda directa, los
+    patrones '*.ext' con rutas agrupadas por extensión y los patrones con prefijo
+    literal (ej. 'docs/api/*.md') evaluando solo la ventana de rutas ordenadas que
+    comparten ese prefijo; únicamente los patrones sin prefijo recorren todas las rutas.
+    """
+    
+    __slots__ = ('paths', '_position_by_path', '_positions_by_extension',
+                 '_sorted_paths', '_sorted_positions')
+    
+    def __init__(self, paths: List[str]):
+        """
+        Construye el índice.
+        
+        Args:
+            paths: Lista de todas las rutas disponibles
+        """
+        # Rutas únicas en su orden original: ninguna búsqueda retorna duplicados
+        self.paths: Tuple[str, ...] = tuple(dict.fromkeys(paths))
+        self._position_by_path: Dict[str, int] = {}
+        self._positions_by_extension: Dict[str, List[int]] = defaultdict(list)
+        for position, path in enumerate(self.paths):
+            self._position_by_path[path] = position
+            _, dot, extension = path.rpartition('.')
+            if dot:
+                self._positions_by_extension[extension].append(position)
+        
+        # Rutas ordenadas (con su posición original) para búsquedas por prefijo
+        order = sorted(range(len(self.paths)), key=self.paths.__getitem__)
+        self._sorted_paths: List[str] = [self.paths[position] for position in order]
+        self._sorted_positions: List[int] = order
+    
+    def match(self, patterns: List[str]) -> List[str]:
+        """
+        Retorna las rutas que coinciden con algún patrón, en el orden original.
+        
+        Args:
+            patterns: Lista de patrones de búsqueda (estilo Unix glob)
+            
+        Returns:
+            Lista de rutas que coinciden con al menos un patrón
+        """
+        positions: Set[int] = set()
+        for pattern in patterns:
+            if _GLOB_CHARS.isdisjoint(pattern):
+                position = self._position_by_path.get(pattern)
+                if position is not None:
+                    positions.add(position)
+                continue
+            
+            extension = _extension_of_pattern(pattern)
+            if extension is not None:
+                positions.update(self._positions_by_extension.get(extension, ()))
+                continue
+            
+            prefix = _literal_prefix(pattern)
+            if not prefix:
+                # Patrón sin prefijo literal: se evalúan todos los patrones en un solo recorrido
+                return find_matching_paths(self.paths, patterns)
+            positions.update(self._match_prefixed(pattern, prefix))
+        
+        return [self.paths[position] for position in sorted(positions)]
+    
+    def _match_prefixed(self, pattern: str, prefix: str) -> List[int]:
+        """Evalúa el patrón solo sobre las rutas ordenadas que empiezan por `prefix`."""
+        start = bisect_left(self._sorted_paths, prefix)
+        end = bisect_left(self._sorted_paths, prefix + _MAX_CHAR, start)
+        match = _compile_patterns((pattern,)).match
+        return [
+            self._sorted_positions[index]
+            for index in range(start, end)
+            if match(self._sorted_paths[index])
+        ]
 
 
 class MarkdownLoader:
@@ -197,9 +501,12 @@ class MarkdownLoader:
     Maneja la carga de documentos Markdown usando cache para optimizar rendimiento.
     
     Utiliza DocumentCache para evitar cargas duplicadas del mismo archivo
-    cuando múltiples reglas lo requieren.
+    cuando múltiples reglas lo requieren; el cache carga en paralelo (o en lote)
+    los archivos que aún no tiene.
     """
     
+    __slots__ = ('document_cache',)
+    
     def __init__(self, document_cache: DocumentCache):
         """
         Inicializa el cargador con un cache de documentos.
@@ -218,7 +525,7 @@ class MarkdownLoader:
             repository_url: URL del repositorio
             
         Returns:
-            Diccionario mapeando ruta -> MarkdownDocument
+            Diccionario mapeando ruta -> MarkdownDocument, en el orden de `paths`
             
         Raises:
             Exception: Si hay error cargando cualquier archivo
@@ -234,6 +541,8 @@ class RuleProcessor:
     de documentos para una regla específica.
     """
     
+    __slots__ = ('markdown_loader',)
+    
     def __init__(self, markdown_loader: MarkdownLoader):
         """
         Inicializa el procesador con sus dependencias.
@@ -243,7 +552,7 @@ class RuleProcessor:
         """
         self.markdown_loader = markdown_loader
     
-    def process_rule(self, rule: RuleData, available_paths: List[str], repository_url: str) -> bool:
+    def process_rule(self, rule: RuleData, available_paths: Union[List[str], PathIndex], repository_url: str) -> bool:
         """
         Ejecuta el procesamiento completo de una regla individual.
         
@@ -255,78 +564,102 @@ class RuleProcessor:
         Returns:
             bool: True si la regla se procesó exitosamente, False si se omitió
         """
-        logger.info(LogMessages.RULE_PROCESSING_START.format(rule_id=rule.id))
+        target_paths = self.prepare_rule(rule, available_paths)
+        if not target_paths:
+            return False
+        
+        # Paso 3: Cargar documentos usando cache y asignarlos a la regla
+        self._load_rule_documents(rule, target_paths, repository_url)
+        self.log_rule_loaded(rule)
+        
+        return True
+    
+    def prepare_rule(self, rule: RuleData, available_paths: Union[List[str], PathIndex]) -> List[str]:
+        """
+        Valida la regla y encuentra sus rutas objetivo (solo CPU, sin invocar lambdas).
+        
+        Args:
+            rule: Regla a preparar
+            available_paths: Lista de todas las rutas disponibles en el repositorio
+            
+        Returns:
+            Lista de rutas a cargar, vacía si la regla se omite
+        """
+        logger.info(LogMessages.RULE_PROCESSING_START, rule.id)
         
         # Paso 1: Validar estructura de la regla
         if not is_rule_valid(rule):
-            logger.warning(LogMessages.RULE_INVALID.format(rule_id=rule.id))
-            return False
+            logger.warning(LogMessages.RULE_INVALID, rule.id)
+            return []
         
         # Paso 2: Encontrar archivos que coincidan con los patrones
         target_paths = self._find_target_paths(rule, available_paths)
         if not target_paths:
-            logger.info(LogMessages.RULE_NO_SOURCES.format(rule_id=rule.id))
-            logger.info(LogMessages.RULE_PROCESSING_SKIPPED.format(rule_id=rule.id))
-            return False
-        
-        # Log de archivos encontrados
-        logger.info(LogMessages.RULE_FOUND_TARGETS.format(
-            rule_id=rule.id, 
-            count=len(target_paths), 
-            files=target_paths
-        ))
-             
-        # Paso 3: Cargar documentos usando cache y asignarlos a la regla
-        logger.info(LogMessages.RULE_LOADING_DOCUMENTS.format(
-            rule_id=rule.id, 
-            count=len(target_paths)
-        ))
+            logger.info(LogMessages.RULE_NO_SOURCES, rule.id)
+            logger.info(LogMessages.RULE_PROCESSING_SKIPPED, rule.id)
+            return []
         
-        self._load_rule_documents(rule, target_paths, repository_url)
+        # Log de archivos encontrados (la lista completa solo se formatea si INFO está activo)
+        logger.info(LogMessages.RULE_FOUND_TARGETS, rule.id, len(target_paths), target_paths)
+        logger.info(LogMessages.RULE_LOADING_DOCUMENTS, rule.id, len(target_paths))
         
-        # Log de documentos cargados exitosamente
-        loaded_paths = self._get_loaded_paths(rule)
-        logger.info(LogMessages.RULE_DOCUMENTS_LOADED.format(
-            rule_id=rule.id, 
-            count=len(loaded_paths), 
-            files=loaded_paths
-        ))
+        return target_paths
+    
+    def log_rule_loaded(self, rule: RuleData) -> None:
+        """
+        Registra los documentos cargados en una regla procesada.
         
-        logger.info(LogMessages.RULE_PROCESSING_SUCCESS.format(
-            rule_id=rule.id, 
-            count=len(loaded_paths)
-        ))
+        Args:
+            rule: Regla con sus documentos ya asignados
+        """
+        if not logger.isEnabledFor(logging.INFO):
+            return
         
-        return True
+        loaded_paths = self._get_loaded_paths(rule)
+        logger.info(LogMessages.RULE_DOCUMENTS_LOADED, rule.id, len(loaded_paths), loaded_paths)
+        logger.info(LogMessages.RULE_PROCESSING_SUCCESS, rule.id, len(loaded_paths))
     
-    def _find_target_paths(self, rule: RuleData, available_paths: List[str]) -> List[str]:
+    def _find_target_paths(self, rule: RuleData, available_paths: Union[List[str], PathIndex]) -> List[str]:
         """
         Identifica todas las rutas objetivo para una regla según sus patrones.
         
-        Combina archivos fuente y destino en una sola lista sin duplicados.
+        Combina archivos fuente y destino en una sola lista sin duplicados y con
+        orden determinista (fuentes primero, luego destinos, cada grupo en el orden
+        de `available_paths`), de modo que los logs son comparables entre ejecuciones.
         
         Args:
             rule: Regla con patrones de búsqueda
             available_paths: Rutas disponibles para buscar
             
         Returns:
-            Lista única de rutas que coinciden con los patrones de la regla
+            Lista única y ordenada de rutas que coinciden con los patrones de la regla
         """
         source_pattern, destiny_patterns = extract_patterns_from_rule(rule)
         
-        # Buscar archivos fuente (obligatorios)
-        sources = find_matching_paths(available_paths, [source_pattern])
+        if not isinstance(available_paths, PathIndex):
+            available_paths = PathIndex(available_paths)
         
-        # Buscar archivos destino (opcionales)
-        targets = find_matching_paths(available_paths, destiny_patterns)
+        # Un solo recorrido con fuente (obligatoria) y destinos (opcionales);
+        # el índice retorna cada ruta una sola vez, sin necesidad de deduplicar
+        matches = available_paths.match([source_pattern, *destiny_patterns])
+        if not destiny_patterns:
+            return matches
         
-        # Combinar eliminando duplicados
-        return list(set(sources + targets))
+        # Fuentes primero y luego destinos, conservando el orden de aparición;
+        # solo se re-evalúa el patrón fuente sobre las rutas ya coincidentes
+        is_source = _compile_patterns((source_pattern,)).match
+        sources, targets = [], []
+        for path in matches:
+            (sources if is_source(path) else targets).append(path)
+        sources.extend(targets)
+        return sources
     
     def _load_rule_documents(self, rule: RuleData, paths: List[str], repository_url: str) -> None:
         """
         Carga los documentos Markdown usando cache y los asigna a la regla.
         
+        `rule.markdownfiles` queda siempre como Dict[ruta, MarkdownDocument].
+        
         Args:
             rule: Regla a la cual asignar los documentos
             paths: Rutas de archivos a cargar
@@ -344,42 +677,110 @@ class RuleProcessor:
         Returns:
             Lista de paths de documentos cargados
         """
-        if not hasattr(rule, 'markdownfiles') or not rule.markdownfiles:
-            return []
+        return _rule_file_paths(rule)
+
+
+def _rule_file_paths(rule: RuleData) -> List[str]:
+    """
+    Retorna las rutas de los documentos asignados a una regla.
+    
+    Invariante: el binder siempre asigna `markdownfiles` como Dict[ruta, MarkdownDocument];
+    las reglas no procesadas conservan la lista vacía por defecto de RuleData.
+    
+    Args:
+        rule: Regla procesada
         
-        if isinstance(rule.markdownfiles, dict):
-            return list(rule.markdownfiles.keys())
-        elif isinstance(rule.markdownfiles, list):
-            return [doc.path for doc in rule.markdownfiles]
-        else:
-            return []
+    Returns:
+        Lista de paths de documentos cargados (vacía si no tiene)
+    """
+    markdownfiles = rule.markdownfiles
+    if not markdownfiles:
+        return []
+    assert isinstance(markdownfiles, dict), f"markdownfiles de la regla '{rule.id}' debe ser un dict"
+    return list(markdownfiles)
+
+
+@dataclass(slots=True)
+class RulesIndex:
+    """
+    Resumen de reglas y archivos calculado en una sola pasada.
+    
+    Alimenta el resumen de logs y todos los getters de MarkdownRuleBinder
+    sin volver a recorrer las reglas.
+    """
+    rules_with_files: List[Tuple[str, List[str]]]
+    rules_without_files: List[str]
+    unique_paths: FrozenSet[str]
+    total_files: int
+    
+    @classmethod
+    def build(cls, rules: List[RuleData]) -> 'RulesIndex':
+        """
+        Construye el índice recorriendo las reglas una sola vez.
+        
+        Args:
+            rules: Lista de reglas procesadas
+            
+        Returns:
+            RulesIndex con los archivos de cada regla
+        """
+        rules_with_files = []
+        rules_without_files = []
+        for rule in rules:
+            # Un solo acceso al atributo por regla; el invariante de tipo lo garantiza el binder
+            markdownfiles = rule.markdownfiles
+            if markdownfiles:
+                rules_with_files.append((rule.id, list(markdownfiles)))
+            else:
+                rules_without_files.append(rule.id)
+        
+        return cls(
+            rules_with_files=rules_with_files,
+            rules_without_files=rules_without_files,
+            unique_paths=frozenset(chain.from_iterable(paths for _, paths in rules_with_files)),
+            total_files=sum(len(paths) for _, paths in rules_with_files)
+        )
 
 
 class MarkdownRuleBinder:
     """
     Coordinador principal del proceso de correlación entre reglas y documentos Markdown.
     
-    Orquesta el procesamiento secuencial de reglas con cache optimizado.
+    Orquesta el procesamiento de reglas con cache optimizado, cargando en
+    paralelo los documentos de reglas independientes.
     Versión simplificada basada en tu código, eliminando el tracking innecesario
     de archivos duplicados ya que el cache maneja las cargas duplicadas.
     """
     
-    def __init__(self, markdown_provider: MarkdownConsumer):
+    __slots__ = ('max_workers', 'document_cache', 'markdown_loader', 'rule_processor',
+                 '_indexed_rules', '_rules_index')
+    
+    def __init__(self, markdown_provider: MarkdownConsumer, max_workers: int = DEFAULT_MAX_WORKERS,
+                 document_cache: DocumentCache = None):
         """
         Inicializa el coordinador con un proveedor de archivos Markdown.
         
         Args:
             markdown_provider: Objeto que implementa get_file_markdown(path, repo_url)
+            max_workers: Máximo de reglas (y de archivos por regla) cargando en paralelo
+            document_cache: Cache a reutilizar entre varios binders del mismo repositorio
+                (opcional); por defecto se crea uno nuevo
         """
-        self.document_cache = DocumentCache(markdown_provider)
+        self.max_workers = max_workers
+        self.document_cache = document_cache or DocumentCache(markdown_provider, max_workers)
         self.markdown_loader = MarkdownLoader(self.document_cache)
         self.rule_processor = RuleProcessor(self.markdown_loader)
+        
+        # Índice de la última lista de reglas procesada (se reutiliza en los getters)
+        self._indexed_rules: Optional[List[RuleData]] = None
+        self._rules_index: Optional[RulesIndex] = None
     
     def run(self, rules: List[RuleData], paths: List[str], repository_url: str) -> Dict[str, any]:
         """
         Ejecuta el proceso completo de correlación para todas las reglas.
         
-        Procesa cada regla secuencialmente con cache optimizado.
+        La validación y búsqueda de rutas se hace secuencialmente (solo CPU);
+        luego se precargan en lote todas las rutas y se asignan a cada regla.
         
         Args:
             rules: Lista de reglas a procesar en orden
@@ -393,40 +794,144 @@ class MarkdownRuleBinder:
             Exception: Si ocurre un error crítico durante el procesamiento
         """
         processed_count = 0
+        rules_with_references = 0
         
+        # Rutas y URL internadas una vez: índice, resultados y claves del cache comparten las cadenas
+        paths = [sys.intern(path) for path in paths]
+        repository_url = sys.intern(repository_url)
+        
+        # Fase 1: validar reglas y resolver rutas objetivo (índice construido una vez)
+        path_index = PathIndex(paths)
+        pending = []
         for rule in rules:
+            if rule.references:
+                rules_with_references += 1
             try:
-                if self.rule_processor.process_rule(rule, paths, repository_url):
-                    processed_count += 1
-                    
+                target_paths = self.rule_processor.prepare_rule(rule, path_index)
             except Exception as e:
-                logger.exception(LogMessages.RULE_PROCESSING_ERROR.format(
-                    rule_id=rule.id, 
-                    error=str(e)
-                ))
+                logger.exception(LogMessages.RULE_PROCESSING_ERROR, rule.id, e)
                 raise  # Detener ejecución en errores críticos
+            if target_paths:
+                pending.append((rule, target_paths))
+        
+        # Fase 2: precargar en un solo lote la unión de rutas de todas las reglas
+        prefetched = self._prefetch_documents(pending, repository_url)
+        
+        # Fase 3: asignar documentos a cada regla
+        if prefetched:
+            # Tras la precarga todo son aciertos de cache: asignación en serie, sin pool
+            for rule, target_paths in pending:
+                try:
+                    rule.markdownfiles = self.markdown_loader.load_documents(target_paths, repository_url)
+                except Exception as e:
+                    logger.exception(LogMessages.RULE_PROCESSING_ERROR, rule.id, e)
+                    raise  # Detener ejecución en errores críticos
+                self.rule_processor.log_rule_loaded(rule)
+                processed_count += 1
+        elif pending:
+            # Sin precarga cada regla carga sus rutas; se solapan con un pool por regla
+            with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(pending)))) as executor:
+                futures = [
+                    executor.submit(self.markdown_loader.load_documents, target_paths, repository_url)
+                    for _, target_paths in pending
+                ]
+                # Asignar en orden de envío desde el hilo principal
+                for (rule, _), future in zip(pending, futures):
+                    try:
+                        rule.markdownfiles = future.result()
+                    except Exception as e:
+                        for remaining in futures:
+                            remaining.cancel()
+                        logger.exception(LogMessages.RULE_PROCESSING_ERROR, rule.id, e)
+                        raise  # Detener ejecución en errores críticos
+                    self.rule_processor.log_rule_loaded(rule)
+                    processed_count += 1
         
         # Obtener estadísticas para logging/monitoring
         cache_stats = self.document_cache.get_cache_stats()
         
-        logger.info(LogMessages.PROCESSING_COMPLETE.format(
-            processed=processed_count, 
-            total=len(rules)
-        ))
-        logger.info(LogMessages.CACHE_STATS.format(
-            cached_docs=cache_stats['cached_documents']
-        ))
+        logger.info(LogMessages.PROCESSING_COMPLETE, processed_count, len(rules))
+        logger.info(LogMessages.CACHE_STATS, cache_stats['cached_documents'])
         
-        # Resumen detallado de reglas con archivos
+        # Resumen detallado de reglas con archivos (el índice se reutiliza en los getters)
+        self._indexed_rules = rules
+        self._rules_index = RulesIndex.build(rules)
         self._log_processing_summary(rules)
         
         return {
             'processed_rules': processed_count,
+            'rules_with_references': rules_with_references,
             'total_rules': len(rules),
             'success_rate': processed_count / len(rules) if rules else 0,
             'cache_stats': cache_stats
         }
     
+    def _prefetch_documents(self, pending: List[Tuple[RuleData, List[str]]], repository_url: str) -> bool:
+        """
+        Carga de una vez la unión de rutas objetivo de todas las reglas.
+        
+        Aprovecha la lectura en lote/paralela del cache en lugar de una carga
+        por regla. Con una sola ruta no hace falta precargar; si el cache está
+        acotado y la unión no cabe en él se omite (las primeras rutas se
+        descartarían antes de asignarse).
+        
+        Args:
+            pending: Pares (regla, rutas objetivo) pendientes de carga
+            repository_url: URL del repositorio
+            
+        Returns:
+            False si la unión no cabe en el cache y cada regla debe cargar sus rutas
+            
+        Raises:
+            Exception: Si hay error cargando cualquier archivo
+        """
+        all_targets = list(dict.fromkeys(chain.from_iterable(paths for _, paths in pending)))
+        max_size = self.document_cache.max_size
+        if max_size is not None and len(all_targets) > max_size:
+            return False
+        if len(all_targets) <= 1:
+            return True
+        
+        logger.info(LogMessages.PREFETCH_START, len(all_targets), len(pending))
+        try:
+            self.document_cache.get_documents(all_targets, repository_url)
+        except Exception as e:
+            self._log_prefetch_error(pending, repository_url, e)
+            raise  # Detener ejecución en errores críticos
+        return True
+    
+    def _log_prefetch_error(self, pending: List[Tuple[RuleData, List[str]]], repository_url: str,
+                            error: Exception) -> None:
+        """
+        Atribuye un error de la precarga a la primera regla con rutas sin cargar.
+        
+        Args:
+            pending: Pares (regla, rutas objetivo) de la precarga
+            repository_url: URL del repositorio
+            error: Excepción de la carga
+        """
+        for rule, target_paths in pending:
+            _, misses = self.document_cache.lookup(target_paths, repository_url)
+            if misses:
+                logger.exception(LogMessages.RULE_PROCESSING_ERROR, rule.id, f"'{misses[0]}': {error}")
+                return
+        logger.exception(LogMessages.RULE_PROCESSING_ERROR, pending[0][0].id, error)
+    
+    def _get_rules_index(self, rules: List[RuleData]) -> RulesIndex:
+        """
+        Retorna el índice de `rules`, reutilizando el calculado en run() si es la misma lista.
+        
+        Args:
+            rules: Lista de reglas procesadas
+            
+        Returns:
+            RulesIndex de las reglas
+        """
+        if rules is not self._indexed_rules or self._rules_index is None:
+            self._indexed_rules = rules
+            self._rules_index = RulesIndex.build(rules)
+        return self._rules_index
+    
     def _log_processing_summary(self, rules: List[RuleData]) -> None:
         """
         Registra un resumen detallado de todas las reglas procesadas.
@@ -434,55 +939,42 @@ class MarkdownRuleBinder:
         Args:
             rules: Lista de reglas procesadas
         """
-        logger.info("="*60)
-        logger.info("[📋] RESUMEN DE PROCESAMIENTO DE REGLAS")
-        logger.info("="*60)
+        # El resumen puede tener miles de líneas: no se construye si INFO está deshabilitado
+        if not logger.isEnabledFor(logging.INFO):
+            return
         
-        rules_with_files = []
-        rules_without_files = []
+        index = self._get_rules_index(rules)
+        rules_with_files = index.rules_with_files
+        rules_without_files = index.rules_without_files
+        separator = "=" * 60
         
-        for rule in rules:
-            if hasattr(rule, 'markdownfiles') and rule.markdownfiles:
-                if isinstance(rule.markdownfiles, dict):
-                    file_count = len(rule.markdownfiles)
-                    file_paths = list(rule.markdownfiles.keys())
-                elif isinstance(rule.markdownfiles, list):
-                    file_count = len(rule.markdownfiles)
-                    file_paths = [doc.path for doc in rule.markdownfiles]
-                else:
-                    file_count = 0
-                    file_paths = []
-                
-                if file_count > 0:
-                    rules_with_files.append((rule.id, file_count, file_paths))
-                else:
-                    rules_without_files.append(rule.id)
-            else:
-                rules_without_files.append(rule.id)
+        lines = [separator, "[📋] RESUMEN DE PROCESAMIENTO DE REGLAS", separator]
         
-        # Logging de reglas con archivos
+        # Reglas con archivos
         if rules_with_files:
-            logger.info(f"[✅] Reglas con archivos Markdown ({len(rules_with_files)}):")
-            for rule_id, file_count, file_paths in rules_with_files:
-                logger.info(f"  📁 Regla '{rule_id}': {file_count} archivo(s)")
-                for path in file_paths:
-                    logger.info(f"    └─ {path}")
+            lines.append(f"[✅] Reglas con archivos Markdown ({len(rules_with_files)}):")
+            for rule_id, file_paths in rules_with_files:
+                lines.append(f"  📁 Regla '{rule_id}': {len(file_paths)} archivo(s)")
+                lines.extend(f"    └─ {path}" for path in file_paths)
         
-        # Logging de reglas sin archivos
+        # Reglas sin archivos
         if rules_without_files:
-            logger.info(f"[❌] Reglas sin archivos Markdown ({len(rules_without_files)}):")
-            for rule_id in rules_without_files:
-                logger.info(f"  📂 Regla '{rule_id}': 0 archivos")
+            lines.append(f"[❌] Reglas sin archivos Markdown ({len(rules_without_files)}):")
+            lines.extend(f"  📂 Regla '{rule_id}': 0 archivos" for rule_id in rules_without_files)
         
         # Estadísticas finales
-        total_files = sum(count for _, count, _ in rules_with_files)
-        logger.info("="*60)
-        logger.info(f"[📊] ESTADÍSTICAS FINALES:")
-        logger.info(f"  • Total reglas procesadas: {len(rules)}")
-        logger.info(f"  • Reglas con archivos: {len(rules_with_files)}")
-        logger.info(f"  • Reglas sin archivos: {len(rules_without_files)}")
-        logger.info(f"  • Total archivos cargados: {total_files}")
-        logger.info("="*60)
+        lines.extend((
+            separator,
+            "[📊] ESTADÍSTICAS FINALES:",
+            f"  • Total reglas procesadas: {len(rules)}",
+            f"  • Reglas con archivos: {len(rules_with_files)}",
+            f"  • Reglas sin archivos: {len(rules_without_files)}",
+            f"  • Total archivos cargados: {index.total_files}",
+            separator
+        ))
+        
+        # Un único registro en lugar de uno por línea
+        logger.info("\n".join(lines))
     
     def clear_cache(self) -> None:
         """
@@ -514,16 +1006,41 @@ class MarkdownRuleBinder:
         Returns:
             Lista de todos los paths de archivos Markdown
         """
-        paths = []
+        return list(self.iter_markdown_paths(rules))
+    
+    def iter_markdown_paths(self, rules: List[RuleData]) -> Iterator[str]:
+        """
+        Recorre de forma perezosa los paths de los archivos Markdown procesados.
+        
+        No construye colecciones intermedias: útil cuando solo se necesita
+        el primer path o una comprobación de existencia.
+        
+        Args:
+            rules: Lista de reglas procesadas
+            
+        Yields:
+            Paths de archivos Markdown en orden de reglas
+        """
         for rule in rules:
-            if hasattr(rule, 'markdownfiles') and rule.markdownfiles:
-                if isinstance(rule.markdownfiles, dict):
-                    # Si es diccionario (como en el código original)
-                    paths.extend(rule.markdownfiles.keys())
-                elif isinstance(rule.markdownfiles, list):
-                    # Si es lista (como en el modelo)
-                    paths.extend(doc.path for doc in rule.markdownfiles)
-        return paths
+            markdownfiles = rule.markdownfiles
+            if markdownfiles:
+                yield from markdownfiles
+    
+    def iter_unique_markdown_paths(self, rules: List[RuleData]) -> Iterator[str]:
+        """
+        Recorre de forma perezosa los paths únicos de los archivos Markdown procesados.
+        
+        Args:
+            rules: Lista de reglas procesadas
+            
+        Yields:
+            Cada path una sola vez, en orden de primera aparición
+        """
+        seen = set()
+        for path in self.iter_markdown_paths(rules):
+            if path not in seen:
+                seen.add(path)
+                yield path
     
     def get_paths_by_rule(self, rules: List[RuleData]) -> Dict[str, List[str]]:
         """
@@ -535,16 +1052,7 @@ class MarkdownRuleBinder:
         Returns:
             Dict mapeando rule_id -> lista de paths
         """
-        result = {}
-        for rule in rules:
-            if hasattr(rule, 'markdownfiles') and rule.markdownfiles:
-                if isinstance(rule.markdownfiles, dict):
-                    # Si es diccionario (como en el código original)
-                    result[rule.id] = list(rule.markdownfiles.keys())
-                elif isinstance(rule.markdownfiles, list):
-                    # Si es lista (como en el modelo)
-                    result[rule.id] = [doc.path for doc in rule.markdownfiles]
-        return result
+        return {rule_id: list(paths) for rule_id, paths in self._get_rules_index(rules).rules_with_files}
     
     def get_unique_markdown_paths(self, rules: List[RuleData]) -> Set[str]:
         """
@@ -554,18 +1062,9 @@ class MarkdownRuleBinder:
             rules: Lista de reglas procesadas
             
         Returns:
-            Set de paths únicos
+            Set de paths únicos (copia propia del llamador; el índice no se modifica)
         """
-        paths = set()
-        for rule in rules:
-            if hasattr(rule, 'markdownfiles') and rule.markdownfiles:
-                if isinstance(rule.markdownfiles, dict):
-                    # Si es diccionario (como en el código original)
-                    paths.update(rule.markdownfiles.keys())
-                elif isinstance(rule.markdownfiles, list):
-                    # Si es lista (como en el modelo)
-                    paths.update(doc.path for doc in rule.markdownfiles)
-        return paths
+        return set(self._get_rules_index(rules).unique_paths)
     
     def count_total_markdown_files(self, rules: List[RuleData]) -> int:
         """
@@ -577,16 +1076,10 @@ class MarkdownRuleBinder:
         Returns:
             Número total de archivos Markdown
         """
-        total = 0
-        for rule in rules:
-            if hasattr(rule, 'markdownfiles') and rule.markdownfiles:
-                if isinstance(rule.markdownfiles, dict):
-                    # Si es diccionario (como en el código original)
-                    total += len(rule.markdownfiles)
-                elif isinstance(rule.markdownfiles, list):
-                    # Si es lista (como en el modelo)
-                    total += len(rule.markdownfiles)
-        return total
+        if rules is self._indexed_rules and self._rules_index is not None:
+            return self._rules_index.total_files
+        # Sin índice previo se cuenta directamente, sin construirlo
+        return sum(len(markdownfiles) for rule in rules if (markdownfiles := rule.markdownfiles))
     
     def log_rules_with_files(self, rules: List[RuleData]) -> None:
         """
@@ -607,37 +1100,22 @@ class MarkdownRuleBinder:
         Returns:
             Dict con resumen detallado de reglas y archivos
         """
-        rules_with_files = {}
-        rules_without_files = []
-        
-        for rule in rules:
-            if hasattr(rule, 'markdownfiles') and rule.markdownfiles:
-                if isinstance(rule.markdownfiles, dict):
-                    file_paths = list(rule.markdownfiles.keys())
-                elif isinstance(rule.markdownfiles, list):
-                    file_paths = [doc.path for doc in rule.markdownfiles]
-                else:
-                    file_paths = []
-                
-                if file_paths:
-                    rules_with_files[rule.id] = {
-                        'file_count': len(file_paths),
-                        'file_paths': file_paths
-                    }
-                else:
-                    rules_without_files.append(rule.id)
-            else:
-                rules_without_files.append(rule.id)
-        
-        total_files = sum(info['file_count'] for info in rules_with_files.values())
+        index = self._get_rules_index(rules)
+        rules_with_files = {
+            rule_id: {
+                'file_count': len(file_paths),
+                'file_paths': list(file_paths)
+            }
+            for rule_id, file_paths in index.rules_with_files
+        }
         
         return {
             'rules_with_files': rules_with_files,
-            'rules_without_files': rules_without_files,
+            'rules_without_files': list(index.rules_without_files),
             'summary': {
                 'total_rules': len(rules),
                 'rules_with_files_count': len(rules_with_files),
-                'rules_without_files_count': len(rules_without_files),
-                'total_files_loaded': total_files
+                'rules_without_files_count': len(index.rules_without_files),
+                'total_files_loaded': index.total_files
             }
-        }
\ No newline at end of file
+        }
@@ -1,8 +1,10 @@
+import sys
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 
-@dataclass
+@dataclass(slots=True)
 class LambdaResult:
     """
     Resultado de una invocación de Lambda.
@@ -14,7 +16,7 @@ class LambdaResult:
     lambda_name: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class MarkdownDocument:
     """
     Representa un archivo Markdown con su ruta y contenido.
@@ -26,7 +28,7 @@ class MarkdownDocument:
         return value in self.content
 
 
-@dataclass
+@dataclass(slots=True)
 class MarkdownResponse:
     """Respuesta de markdown desde las lambdas."""
     success: bool
@@ -37,7 +39,7 @@ class MarkdownResponse:
     files: Optional[List[str]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class S3Result:
     """Resultado de operación S3."""
     success: bool
@@ -46,7 +48,7 @@ class S3Result:
     execution_time: Optional[float] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class RuleData:
     """
     Modelo que representa una regla de validación semántica o estructural.
@@ -63,15 +65,46 @@ class RuleData:
     tags: List[str] = field(default_factory=list)  # Etiquetas asociadas para filtrado o agrupación
     
     def __post_init__(self):
-        """Validación y conversión de tipos después de la inicialización."""
-        # Convierte integers a strings para explanation (equivalente al field_validator)
-        if self.explanation is not None and isinstance(self.explanation, int):
-            self.explanation = str(self.explanation)
+        """Normalización barata que aplica a toda construcción, incluidas las internas."""
+        # Campos categóricos con pocos valores distintos: una sola copia compartida por todas las reglas
+        if isinstance(self.type, str):
+            self.type = sys.intern(self.type)
+        if isinstance(self.criticality, str):
+            self.criticality = sys.intern(self.criticality)
+        if isinstance(self.projects, str):
+            self.projects = sys.intern(self.projects)
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RuleData":
+        """
+        Construye una regla desde datos externos (JSON de S3, eventos).
+        
+        La conversión de tipos de entrada se hace aquí, una sola vez en la frontera,
+        y no en cada RuleData que se reconstruye internamente.
+        """
+        explanation = data.get('explanation')
+        if isinstance(explanation, int):
+            data = {**data, 'explanation': cls.normalize_explanation(explanation)}
+        return cls(**data)
+    
+    @staticmethod
+    def normalize_explanation(explanation: Any) -> Optional[str]:
+        """Convierte integers a strings para explanation (equivalente al field_validator)."""
+        return str(explanation) if isinstance(explanation, int) else explanation
     
     @property
-    def parsed_references(self) -> List[str]:
+    def parsed_references(self) -> Tuple[str, ...]:
         """
-        Devuelve la cadena `references` separada por comas como lista, limpiando espacios.
-        Si `references` es None, retorna una lista vacía.
+        Devuelve la cadena `references` separada por comas como tupla, limpiando espacios.
+        Si `references` es None, retorna una tupla vacía.
+        
+        El resultado se memoiza por el texto de `references`, por lo que accesos
+        repetidos (o reglas con las mismas referencias) comparten la misma tupla.
         """
-        return [r.strip() for r in self.references.split(",")] if self.references else []
\ No newline at end of file
+        return _parse_references(self.references) if self.references else ()
+
+
+@lru_cache(maxsize=1024)
+def _parse_references(references: str) -> Tuple[str, ...]:
+    """Separa una cadena de referencias por comas; memoizada por su texto."""
+    return tuple(r.strip() for r in references.split(","))
\ No newline at end of file
@@ -14,6 +14,8 @@
 """
 
 # ===== IMPORTS OPTIMIZADOS PARA LAMBDA =====
+from collections import OrderedDict
+from functools import lru_cache
 from typing import List, Dict, Union, Callable, Optional, Any
 import re
 from datetime import datetime
@@ -30,9 +32,9 @@ class LambdaCache:
     """Cache optimizado específicamente para AWS Lambda warm reuse"""
     
     def __init__(self, max_size: int = CACHE_SIZE):
-        self._cache: Dict[str, any] = {}
+        # OrderedDict mantiene el orden de acceso: mover y descartar son O(1)
+        self._cache: "OrderedDict[str, any]" = OrderedDict()
         self._max_size = max_size
-        self._access_order: List[str] = []
         self._hits = 0
         self._requests = 0
     
@@ -42,8 +44,7 @@ class LambdaCache:
         if key in self._cache:
             self._hits += 1
             # Mover al final (más reciente)
-            self._access_order.remove(key)
-            self._access_order.append(key)
+            self._cache.move_to_end(key)
             return self._cache[key]
         return None
     
@@ -51,19 +52,16 @@ class LambdaCache:
         """Guarda valor con estrategia LRU"""
         if key in self._cache:
             # Actualizar existente
-            self._access_order.remove(key)
+            self._cache.move_to_end(key)
         elif len(self._cache) >= self._max_size:
             # Eliminar el menos usado (LRU)
-            oldest = self._access_order.pop(0)
-            del self._cache[oldest]
+            self._cache.popitem(last=False)
         
         self._cache[key] = value
-        self._access_order.append(key)
     
     def clear(self):
         """Limpia cache completamente"""
         self._cache.clear()
-        self._access_order.clear()
         self._hits = 0
         self._requests = 0
     
@@ -146,19 +144,32 @@ class ExpressionExtractor:
             Resultado como string o mensaje de error
         """
         try:
-            # Validación de seguridad
-            if not all(c in SAFE_EVAL_CHARS for c in expression):
+            # Validación de seguridad y compilación (una sola vez por expresión)
+            code = ExpressionExtractor._compile(expression)
+            if code is None:
                 return f"[unsafe_chars: {expression}]"
             
             # Contexto seguro
             context = {'group': obj, **SAFE_EVAL_FUNCTIONS}
             
             # Evaluación controlada
-            result = eval(expression, {"__builtins__": {}}, context)
+            result = eval(code, {"__builtins__": {}}, context)
             return str(result)
             
         except Exception as e:
             return f"[expression_error: {str(e)}]"
+    
+    @staticmethod
+    @lru_cache(maxsize=CACHE_SIZE)
+    def _compile(expression: str):
+        """
+        Valida y compila una expresión; la misma plantilla se evalúa para cada grupo
+        Returns:
+            Code object listo para eval, o None si contiene caracteres no permitidos
+        """
+        if not SAFE_EVAL_CHARS.issuperset(expression):
+            return None
+        return compile(expression, '<string>', 'eval')
 
 # ===== MARKDOWN ENRICHER AVANZADO (Responsabilidad: Solo enriquecimiento inteligente) =====
 class AdvancedMarkdownEnricher:
@@ -176,6 +187,11 @@ class AdvancedMarkdownEnricher:
         r'test|spec|\.test\.|\.spec\.',
         r'package\.json|tsconfig|webpack'
     ]
+    _TECHNICAL_REGEXES = tuple(re.compile(pattern) for pattern in TECHNICAL_PATTERNS)
+    
+    # Palabras clave por tipo de contenido
+    EXECUTIVE_KEYWORDS = ['proyecto', 'cliente', 'presupuesto', 'deadline', 'equipo', 'líder']
+    VALIDATION_KEYWORDS = ['regla', 'cumple', 'valida', 'analiza', 'estructura', 'archivo']
     
     # Palabras de severidad y estado
     SEVERITY_WORDS = {
@@ -227,24 +243,29 @@ class AdvancedMarkdownEnricher:
     def detect_content_type(text: str) -> str:
         """Detecta el tipo de contenido para enriquecimiento contextual"""
         text_lower = text.lower()
+        enricher = AdvancedMarkdownEnricher
         
-        technical_score = sum(1 for pattern in AdvancedMarkdownEnricher.TECHNICAL_PATTERNS 
-                            if re.search(pattern, text_lower))
-        
-        executive_keywords = ['proyecto', 'cliente', 'presupuesto', 'deadline', 'equipo', 'líder']
-        executive_score = sum(1 for keyword in executive_keywords if keyword in text_lower)
-        
-        validation_keywords = ['regla', 'cumple', 'valida', 'analiza', 'estructura', 'archivo']
-        validation_score = sum(1 for keyword in validation_keywords if keyword in text_lower)
-        
+        # Cada puntuación solo se calcula si la anterior no decidió el tipo
+        technical_score = sum(1 for regex in enricher._TECHNICAL_REGEXES if regex.search(text_lower))
         if technical_score >= 3:
             return 'technical'
-        elif executive_score >= 2:
+        
+        if enricher._has_keywords(text_lower, enricher.EXECUTIVE_KEYWORDS, 2):
             return 'executive'
-        elif validation_score >= 2:
+        if enricher._has_keywords(text_lower, enricher.VALIDATION_KEYWORDS, 2):
             return 'validation'
-        else:
-            return 'general'
+        return 'general'
+    
+    @staticmethod
+    def _has_keywords(text_lower: str, keywords: List[str], minimum: int) -> bool:
+        """Indica si el texto contiene al menos `minimum` palabras clave; corta al alcanzarlo"""
+        found = 0
+        for keyword in keywords:
+            if keyword in text_lower:
+                found += 1
+                if found >= minimum:
+                    return True
+        return False
     
     @staticmethod
     def enrich(text: str) -> str:
@@ -419,21 +440,27 @@ class AdvancedMarkdownEnricher:
     @staticmethod
     def _final_formatting(text: str, content_type: str) -> str:
         """Formateo final según el tipo de contenido"""
+        if content_type not in ('validation', 'executive', 'technical'):
+            return text
+        
+        # Una sola copia en minúsculas para todas las comprobaciones
+        text_lower = text.lower()
+        
         if content_type == 'validation':
-            if '## 🎯' not in text and 'resultado' not in text.lower():
+            if '## 🎯' not in text and 'resultado' not in text_lower:
                 text += '\n\n---\n\n## 🎯 Resumen de Validación\n\n' \
                        '**Estado General:** [Completar]\n\n' \
                        '**Acciones Requeridas:**\n- [Listar acciones necesarias]'
         
         elif content_type == 'executive':
-            if 'próximos pasos' not in text.lower() and 'next steps' not in text.lower():
+            if 'próximos pasos' not in text_lower and 'next steps' not in text_lower:
                 text += '\n\n---\n\n## 🚀 Próximos Pasos\n\n' \
                        '1. [Definir próximas acciones]\n' \
                        '2. [Establecer fechas límite]\n' \
                        '3. [Asignar responsables]'
         
         elif content_type == 'technical':
-            if 'configuración' not in text.lower() and 'config' not in text.lower():
+            if 'configuración' not in text_lower and 'config' not in text_lower:
                 text += '\n\n---\n\n## ⚙️ Configuración Técnica\n\n' \
                        '**Herramientas:** [Listar herramientas utilizadas]\n\n' \
                        '**Versiones:** [Especificar versiones importantes]'
@@ -474,19 +501,15 @@ class ReplacementProcessor:
             # Función lambda
             return self.function_extractor.extract(obj, value)
         elif isinstance(value, str):
-            if (value.startswith('group.') or 
-                ('(' in value and ')' in value and any(func in value for func in SAFE_EVAL_FUNCTIONS))):
-                # Path o expresión
-                if ('(' in value and ')' in value and 
-                    any(func in value for func in SAFE_EVAL_FUNCTIONS)):
-                    # Expresión calculada
-                    return self.expression_extractor.extract(obj, value)
-                else:
-                    # Path navigation
-                    return self.path_extractor.extract(obj, value)
-            else:
-                # String literal
-                return str(value)
+            # La detección de expresión se evalúa una sola vez por reemplazo
+            if '(' in value and ')' in value and any(func in value for func in SAFE_EVAL_FUNCTIONS):
+                # Expresión calculada
+                return self.expression_extractor.extract(obj, value)
+            if value.startswith('group.'):
+                # Path navigation
+                return self.path_extractor.extract(obj, value)
+            # String literal
+            return value
         else:
             # Otros tipos
             return str(value)
@@ -507,9 +530,13 @@ class PromptGenerator:
         """
         results = []
         
+        # La parte de la cache key que depende de los reemplazos es igual para todos los grupos
+        replacements_hash = hash(str(replacements)) % 10000
+        
         for i, group in enumerate(groups):
             try:
-                prompt = self._generate_single_prompt(group, template, replacements, template_structure)
+                prompt = self._generate_single_prompt(group, template, replacements, template_structure,
+                                                      replacements_hash)
                 results.append(prompt)
             except Exception as e:
                 group_name = getattr(group, 'group', f'grupo_{i+1}')
@@ -520,12 +547,15 @@ class PromptGenerator:
     
     def _generate_single_prompt(self, group, template: str, 
                                replacements: Dict[str, Union[str, Callable]],
-                               template_structure: str) -> str:
+                               template_structure: str,
+                               replacements_hash: Optional[int] = None) -> str:
         """Genera prompt para un grupo individual"""
         
-        # 1. Crear cache key para el grupo
+        # 1. Crear cache key para el grupo (hash de reemplazos precalculado por el batch)
+        if replacements_hash is None:
+            replacements_hash = hash(str(replacements)) % 10000
         group_id = getattr(group, 'group', 'unknown')
-        cache_key = f"{group_id}_{hash(str(replacements)) % 10000}"
+        cache_key = f"{group_id}_{replacements_hash}"
         
         # 2. Intentar obtener del cache
         cached_result = self.cache.get(cache_key)
@@ -28,4 +28,4 @@ def report_to_lambda(report_prompt : str, repo_url: str):
 
     lambda_invoker = create_lambda_invoker()
 
-    lambda_invoker.generate_report(report_prompt, repo_url)
\ No newline at end of file
+    lambda_invoker.generate_report_async(report_prompt, repo_url)
\ No newline at end of file
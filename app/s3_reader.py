@@ -2,14 +2,26 @@
 s3_reader.py - Lector simple de JSON desde S3
 """
 
-import json
 import time
 import os
 import boto3
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+try:
+    # orjson (Rust) decodifica JSON varias veces más rápido que json
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 from app.models import S3Result
 from app.config import Config, setup_logger
 
 
+# Máximo de lecturas S3 simultáneas (el cliente boto3 es thread-safe)
+MAX_CONCURRENT_READS = 8
+
 
 class S3JsonReader:
     """Lector simple de archivos JSON desde S3."""
@@ -62,6 +74,14 @@ class S3JsonReader:
         """Lee el archivo de reglas desde S3."""
         return self.read_content(self.config.S3_BUCKET, self.config.TEMPLATE_PROMPT_S3_PATH_STRUCTURE)
     
+    def read_templates(self) -> Tuple[S3Result, S3Result]:
+        """Lee en paralelo la plantilla de prompts y la plantilla de estructura."""
+        template, template_structure = self.read_contents(
+            self.config.S3_BUCKET,
+            (self.config.TEMPLATE_PROMPT_S3_PATH, self.config.TEMPLATE_PROMPT_S3_PATH_STRUCTURE)
+        )
+        return template, template_structure
+    
     def read_template_report(self) -> str:
         """Lee el archivo de reglas desde S3."""
         return self.read_content(self.config.S3_BUCKET, self.config.TEMPLATE_PROMPT_S3_PATH_REPORT)
@@ -139,6 +159,23 @@ class S3JsonReader:
                 execution_time=time.time() - start_time
             )
     
+    def read_contents(self, bucket: str, keys: Sequence[str]) -> List[S3Result]:
+        """
+        Lee varios archivos de S3 en paralelo, con concurrencia acotada.
+        
+        Args:
+            bucket: Nombre del bucket S3
+            keys: Rutas de los archivos en S3
+            
+        Returns:
+            List[S3Result]: Un resultado por cada ruta, en el mismo orden
+        """
+        if len(keys) <= 1:
+            return [self.read_content(bucket, key) for key in keys]
+        
+        with ThreadPoolExecutor(max_workers=min(len(keys), MAX_CONCURRENT_READS)) as executor:
+            return list(executor.map(lambda key: self.read_content(bucket, key), keys))
+    
     def read_json(self, bucket: str, key: str) -> S3Result:
         """
         Lee un archivo JSON desde S3.
@@ -155,10 +192,9 @@ class S3JsonReader:
         try:
             self.logger.info(f"📥 Leyendo s3://{bucket}/{key}")
             
-            # Descargar y parsear JSON
+            # Descargar y parsear JSON directamente desde los bytes (sin decodificar a str)
             response = self.s3_client.get_object(Bucket=bucket, Key=key)
-            content = response['Body'].read().decode('utf-8')
-            json_data = json.loads(content)
+            json_data = _json_loads(response['Body'].read())
             
             execution_time = time.time() - start_time
             self.logger.info(f"✅ JSON leído en {execution_time:.2f}s")
@@ -193,6 +229,12 @@ class S3JsonReader:
         return f"Error leyendo s3://{bucket}/{key}: {str(error)}"
 
 
+@lru_cache(maxsize=1)
 def create_s3_reader(config=None) -> S3JsonReader:
-    """Crea una instancia de S3JsonReader."""
+    """
+    Crea (una sola vez) la instancia compartida de S3JsonReader.
+    
+    Las invocaciones warm de la Lambda reutilizan el mismo lector y su cliente S3,
+    evitando reconstruirlos en cada request.
+    """
     return S3JsonReader(config)
\ No newline at end of file
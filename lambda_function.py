@@ -1,18 +1,19 @@
 import json
 import logging
 import os
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, fields, is_dataclass
 
 from app.markdown_rule_binder import MarkdownRuleBinder
-from app.markdown_provider import MarkdownConsumer
+from app.markdown_provider import create_markdown_consumer
 from app.models import RuleData
-from app.s3_reader import S3JsonReader, create_s3_reader
+from app.s3_reader import create_s3_reader
 from app.final_rule_grouping import group_rules
 from app.prompt_formatter import format_prompts
 from app.bedrock_validator import process_prompts_hybrid_optimized as validate_prompts_lambda, generate_report_sync
 from app.bedrock_client import run_bedrock_prompt
-from app.lambda_invoker import create_lambda_invoker
 from app.report_producer import produce_report, report_to_lambda, gather_prompt_results
 from app.config import Config
 
@@ -21,6 +22,12 @@ logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
 
+@lru_cache(maxsize=128)
+def _split_projects(projects: str) -> frozenset:
+    """Proyectos de una regla como conjunto; memoizado porque hay pocos valores distintos (internados)"""
+    return frozenset(projects.split(','))
+
+
 @dataclass
 class PipelineConfig:
     """Configuración del pipeline de validación"""
@@ -39,12 +46,11 @@ class ValidationPipeline:
     
     def __init__(self, config: PipelineConfig):
         self.config = config
-        self.s3_reader = S3JsonReader()
-        self.markdown_provider = MarkdownConsumer()
+        self.s3_reader = create_s3_reader()
+        self.markdown_provider = create_markdown_consumer()
         self.rules: List[RuleData] = []
         self.groups = []
         self.prompts = []
-        self.lambda_invoker  = create_lambda_invoker()
         self.bedrock_region = os.environ.get('BEDROCK_REGION', '')
     
     def execute(self) -> Dict[str, Any]:
@@ -57,11 +63,12 @@ class ValidationPipeline:
         try:
             logger.info("🚀 Iniciando pipeline de validación")
             
-            # 1. Cargar configuración y reglas
-            self._load_validation_rules()
-            
-            # 2. Procesar estructura del repositorio
-            repository_structure = self._process_repository_structure()
+            # 1 y 2. Reglas (S3) y estructura del repositorio (lambda) son independientes:
+            # la estructura se obtiene en segundo plano mientras se cargan las reglas
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                structure_future = executor.submit(self._process_repository_structure)
+                self._load_validation_rules()
+                repository_structure = structure_future.result()
             
             # 3. Vincular reglas con archivos
             self._bind_rules_to_files(repository_structure)
@@ -95,7 +102,7 @@ class ValidationPipeline:
             delete_temporal_data = Config.DELETE_TEMPORAL_DATA_FOLDER
 
             if delete_temporal_data:
-                delete_response = create_s3_reader().delete_temporal_data()
+                delete_response = self.s3_reader.delete_temporal_data()
                 logger.info(f'Operación de eliminación se ejecuta con status code -> {delete_response.data['ResponseMetadata']['HTTPStatusCode']}')
 
             logger.info("✅ Pipeline ejecutado exitosamente")
@@ -117,11 +124,11 @@ class ValidationPipeline:
         
         try:
             s3_response = self.s3_reader.read_rules()
-            self.rules = [RuleData(**item) for item in s3_response.data]
+            self.rules = [RuleData.from_dict(item) for item in s3_response.data]
             project_type = self._extract_project_type_from_url(self.config.repository_url)
 
             if project_type:
-                self.rules = [rule for rule in self.rules if project_type in rule.projects.split(',')]
+                self.rules = [rule for rule in self.rules if project_type in _split_projects(rule.projects)]
             
             logger.info(f"✅ Cargadas {len(self.rules)} reglas de validación")
             
@@ -160,11 +167,10 @@ class ValidationPipeline:
         
         try:
             runner = MarkdownRuleBinder(self.markdown_provider)
-            runner.run(self.rules, repository_structure.files, self.config.repository_url)
+            binding_stats = runner.run(self.rules, repository_structure.files, self.config.repository_url)
             
-            # Contar reglas vinculadas
-            bound_rules = sum(1 for rule in self.rules if hasattr(rule, 'references') and rule.references)
-            runner.get_unique_markdown_paths(self.rules)
+            # Reglas con referencias: contador mantenido por el binder durante run(), sin recorrer las reglas otra vez
+            bound_rules = binding_stats['rules_with_references']
             logger.info(f"✅ {bound_rules} reglas vinculadas con archivos")
             
         except Exception as e:
@@ -181,8 +187,9 @@ class ValidationPipeline:
             logger.info(f"📊 Reglas agrupadas en {len(self.groups)} grupos")
             
             # Cargar plantillas
-            template = self.s3_reader.read_template().data
-            template_structure = self.s3_reader.read_template_structure().data
+            template_result, template_structure_result = self.s3_reader.read_templates()
+            template = template_result.data
+            template_structure = template_structure_result.data
             
             # Definir reemplazos para las plantillas
             replacements = self._create_template_replacements(repository_structure)
@@ -242,10 +249,11 @@ class ValidationPipeline:
         Returns:
             Lista de prompts en formato: [{"id": "prompt_001", "prompt": "..."}]
         """
+        # Cada prompt se recorta una sola vez (filtro y valor comparten el resultado)
         return [
-            {"id": f"prompt_{i+1:03d}", "prompt": prompt.strip()} 
+            {"id": f"prompt_{i+1:03d}", "prompt": stripped} 
             for i, prompt in enumerate(self.prompts) 
-            if prompt and prompt.strip()
+            if prompt and (stripped := prompt.strip())
         ]
     
     def _generate_final_report(self, validation_result: Dict[str, Any]) -> str:
@@ -282,11 +290,14 @@ class ValidationResultAnalyzer:
         """
         logger.info("🔍 Analizando resultados de validación")
         
+        # Resumen y respuestas IA se obtienen en un único recorrido de los resultados
+        detailed_summary, ai_responses = self._scan_results(validation_result)
+        
         analysis = {
             'basic_info': self._extract_basic_info(validation_result),
             'performance_metrics': self._extract_performance_metrics(validation_result),
-            'detailed_summary': self._extract_detailed_summary(validation_result),
-            'ai_responses': self.get_ai_responses(validation_result),
+            'detailed_summary': detailed_summary,
+            'ai_responses': ai_responses,
             'error_info': self._extract_error_info(validation_result)
         }
         
@@ -326,29 +337,48 @@ class ValidationResultAnalyzer:
         
         return metrics
     
-    def _extract_detailed_summary(self, result: Dict[str, Any]) -> Dict[str, Any]:
-        """Extrae resumen detallado de resultados"""
+    def _scan_results(self, result: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Recorre los resultados una sola vez extrayendo el resumen de ejecución y las respuestas IA
+        
+        Returns:
+            Tupla (resumen detallado, lista de respuestas con su ID correspondiente)
+        """
         if 'results' not in result:
-            return {'total_prompts': 0, 'successful_executions': 0, 'failed_executions': 0}
+            return {'total_prompts': 0, 'successful_executions': 0, 'failed_executions': 0}, []
         
         total_prompts = len(result['results'])
         successful = 0
         failed = 0
+        responses = []
         
         for prompt_result in result['results']:
-            if 'execution' in prompt_result:
-                execution = prompt_result['execution']
-                if execution.get('execution_successful', False):
-                    successful += 1
-                else:
-                    failed += 1
-        
-        return {
+            if 'execution' not in prompt_result:
+                continue
+            
+            execution = prompt_result['execution']
+            execution_successful = execution.get('execution_successful', False)
+            if execution_successful:
+                successful += 1
+            else:
+                failed += 1
+            
+            response = execution.get('response', '')
+            if response:
+                responses.append({
+                    'prompt_id': prompt_result.get('prompt_id', 'unknown'),
+                    'response': response,
+                    'tokens_used': execution.get('tokens_used', 0),
+                    'successful': execution_successful
+                })
+        
+        summary = {
             'total_prompts': total_prompts,
             'successful_executions': successful,
             'failed_executions': failed,
             'success_rate': (successful / total_prompts * 100) if total_prompts > 0 else 0
         }
+        return summary, responses
     
     def _extract_error_info(self, result: Dict[str, Any]) -> Optional[str]:
         """Extrae información de errores si existe"""
@@ -381,27 +411,7 @@ class ValidationResultAnalyzer:
         Returns:
             Lista de respuestas con su ID correspondiente
         """
-        responses = []
-        
-        if 'results' not in validation_result:
-            return responses
-        
-        for prompt_result in validation_result['results']:
-            prompt_id = prompt_result.get('prompt_id', 'unknown')
-            
-            if 'execution' in prompt_result:
-                execution = prompt_result['execution']
-                response = execution.get('response', '')
-                
-                if response:
-                    responses.append({
-                        'prompt_id': prompt_id,
-                        'response': response,
-                        'tokens_used': execution.get('tokens_used', 0),
-                        'successful': execution.get('execution_successful', False)
-                    })
-        
-        return responses
+        return self._scan_results(validation_result)[1]
 
 
 def _extract_config_from_event(event: Dict[str, Any]) -> PipelineConfig:
@@ -559,6 +569,8 @@ def lambda_handler(event, context):
 def _json_fallback(obj):
     if hasattr(obj, "model_dump"):  # Si es Pydantic
         return obj.model_dump()
+    elif is_dataclass(obj):  # Dataclass con __slots__ (sin __dict__)
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
     elif hasattr(obj, "__dict__"):  # Si es clase normal
         return obj.__dict__
     else: